@@ -6,14 +6,17 @@ Analyzes technical audio quality for SONAR datasets
 import asyncio
 import io
 import logging
+import math
 import mimetypes
 import os
 import platform
+import shutil
 import subprocess
 import sys
 import tempfile
-from contextlib import contextmanager
-from typing import Any, Dict, Optional
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Union
 
 import numpy as np
 import soundfile as sf
@@ -21,6 +24,57 @@ import soundfile as sf
 logger = logging.getLogger(__name__)
 
 
+# libsndfile does not scale FLOAT/DOUBLE data read as int16, so [-1, 1]
+# samples would truncate to 0 or +/-1; those are read as float and scaled here
+FLOAT_SUBTYPES = frozenset({"FLOAT", "DOUBLE"})
+INT16_FULL_SCALE = 32768
+
+
+def _is_float_subtype(subtype: Optional[str]) -> bool:
+    return (subtype or "").upper() in FLOAT_SUBTYPES
+
+
+def _float_to_int16(samples: np.ndarray) -> np.ndarray:
+    """Scale [-1, 1] float samples to int16, clipping out-of-range values."""
+    scaled = np.multiply(samples, INT16_FULL_SCALE, dtype=np.float32)
+    np.rint(scaled, out=scaled)
+    np.clip(scaled, -INT16_FULL_SCALE, INT16_FULL_SCALE - 1, out=scaled)
+    return scaled.astype(np.int16)
+
+
+@dataclass
+class DecodedAudio:
+    """PCM decoded once and shared by every check that runs on the same upload."""
+
+    samples: np.ndarray  # int16, shape (frames, channels)
+    sample_rate: int
+    channels: int
+    subtype: str
+    duration: float
+
+
+def decode_audio(audio_bytes: bytes) -> DecodedAudio:
+    """
+    Decode in-memory audio to int16 PCM with libsndfile.
+
+    Raises:
+        soundfile.LibsndfileError: If libsndfile cannot read the container
+    """
+    with sf.SoundFile(io.BytesIO(audio_bytes)) as audio_file:
+        if _is_float_subtype(audio_file.subtype):
+            samples = _float_to_int16(audio_file.read(dtype="float32", always_2d=True))
+        else:
+            samples = audio_file.read(dtype="int16", always_2d=True)
+        sample_rate = audio_file.samplerate
+        return DecodedAudio(
+            samples=samples,
+            sample_rate=sample_rate,
+            channels=audio_file.channels,
+            subtype=audio_file.subtype or "",
+            duration=len(samples) / float(sample_rate) if sample_rate else 0.0,
+        )
+
+
 @contextmanager
 def capture_c_stderr():
     """
@@ -90,21 +144,50 @@ class AudioQualityChecker:
         self.CLIPPING_THRESHOLD = 0.995  # normalized amplitude
         self.MIN_CLIPPING_PERCENT = 0.5  # minimum percent of samples above threshold to flag
         self._silence_linear_threshold = 10 ** (self.SILENCE_THRESHOLD / 20.0)
-
-    async def check_audio(self, audio_bytes: bytes) -> Dict[str, Any]:
+        # Full-scale magnitude of the int16 samples the analysis reads
+        self._int_full_scale = INT16_FULL_SCALE
+        # Process-wide cap on concurrent CPU-heavy jobs, shared with
+        # fingerprinting; set by the app (see main.lifespan), uncapped if None
+        self.cpu_slots: Optional[asyncio.Semaphore] = None
+
+    async def check_audio(
+        self, audio: Union[bytes, memoryview, BinaryIO, DecodedAudio]
+    ) -> Dict[str, Any]:
         """
-        Analyze audio quality from in-memory bytes.
+        Analyze audio quality from in-memory bytes, a seekable binary file
+        object, or already-decoded PCM.
 
         Retained for legacy endpoints where the audio is already loaded into RAM.
+        File objects (e.g. an upload's spooled temp file) are decoded in place
+        without reading them into memory first.
         """
         try:
-            return await asyncio.to_thread(self._analyze_bytes, audio_bytes)
+            async with self.cpu_slots or nullcontext():
+                if isinstance(audio, DecodedAudio):
+                    return await asyncio.to_thread(self._analyze_decoded, audio)
+                return await asyncio.to_thread(self._analyze_bytes, audio)
         except Exception as exc:
             return {
                 "quality": None,
                 "errors": [f"Failed to analyze audio: {exc}"]
             }
 
+    async def check_audio_batch(self, audio_blobs: List[bytes]) -> List[Dict[str, Any]]:
+        """
+        Analyze several in-memory audio blobs concurrently.
+
+        Decoding and the NumPy reductions release the GIL, so each blob runs in
+        its own worker thread, bounded by the CPU count. Results are returned in
+        input order with the same shape as check_audio().
+        """
+        semaphore = asyncio.Semaphore(os.cpu_count() or 1)
+
+        async def check_one(audio_bytes: bytes) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.check_audio(audio_bytes)
+
+        return list(await asyncio.gather(*(check_one(blob) for blob in audio_blobs)))
+
     async def check_audio_file(self, file_path: str, session_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Analyze audio quality from disk, streaming samples to avoid large allocations.
@@ -129,7 +212,8 @@ class AudioQualityChecker:
                 }
             )
 
-            return await asyncio.to_thread(self._analyze_file, file_path, session_id)
+            async with self.cpu_slots or nullcontext():
+                return await asyncio.to_thread(self._analyze_file, file_path, session_id)
         except Exception as exc:
             logger.error(
                 f"{log_context}Failed to analyze audio file: {exc}",
@@ -210,16 +294,79 @@ class AudioQualityChecker:
                     "warnings": []
                 }
 
-    def _analyze_bytes(self, audio_bytes: bytes) -> Dict[str, Any]:
-        with sf.SoundFile(io.BytesIO(audio_bytes)) as audio_file:
-            return self._analyze_stream(audio_file)
+    def _analyze_bytes(self, audio: Union[bytes, memoryview, BinaryIO]) -> Dict[str, Any]:
+        # soundfile reads any seekable file-like; only raw buffers need wrapping
+        source = io.BytesIO(audio) if isinstance(audio, (bytes, bytearray, memoryview)) else audio
+        try:
+            # Decode straight from memory; libsndfile hands back NumPy blocks
+            with sf.SoundFile(source) as audio_file:
+                return self._analyze_stream(audio_file)
+        except sf.LibsndfileError as exc:
+            logger.warning(f"Soundfile could not decode in-memory audio, spilling to disk: {exc}")
+
+        # Containers libsndfile can't read go through the file path, which
+        # probes the format and falls back to ffmpeg conversion
+        fd, tmp_path = tempfile.mkstemp(prefix="check_audio_")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                source.seek(0)
+                shutil.copyfileobj(source, tmp_file)
+            return self._analyze_file(tmp_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def _analyze_decoded(self, decoded: DecodedAudio, session_id: Optional[str] = None) -> Dict[str, Any]:
+        block_frames = self._block_frames(decoded.sample_rate)
+        samples = decoded.samples
+        blocks = (samples[i:i + block_frames] for i in range(0, len(samples), block_frames))
+        return self._analyze_blocks(
+            blocks,
+            decoded.sample_rate,
+            decoded.channels,
+            decoded.subtype,
+            len(samples),
+            session_id
+        )
 
     def _analyze_stream(self, audio_file: sf.SoundFile, session_id: Optional[str] = None) -> Dict[str, Any]:
         audio_file.seek(0)
-        sample_rate = audio_file.samplerate
-        channels = audio_file.channels
-        subtype = audio_file.subtype or ""
-        duration = len(audio_file) / float(sample_rate) if sample_rate else 0.0
+        blocksize = self._block_frames(audio_file.samplerate)
+        if _is_float_subtype(audio_file.subtype):
+            blocks = map(_float_to_int16, audio_file.blocks(
+                blocksize=blocksize,
+                dtype="float32",
+                always_2d=True
+            ))
+        else:
+            blocks = audio_file.blocks(
+                blocksize=blocksize,
+                dtype="int16",
+                always_2d=True
+            )
+        return self._analyze_blocks(
+            blocks,
+            audio_file.samplerate,
+            audio_file.channels,
+            audio_file.subtype or "",
+            len(audio_file),
+            session_id
+        )
+
+    def _block_frames(self, sample_rate: int) -> int:
+        return max(sample_rate // 2, 4096)  # roughly 0.5s per block
+
+    def _analyze_blocks(
+        self,
+        blocks: Iterable[np.ndarray],
+        sample_rate: int,
+        channels: int,
+        subtype: str,
+        frames: int,
+        session_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Run the quality checks over int16 sample blocks shaped (frames, channels)."""
+        duration = frames / float(sample_rate) if sample_rate else 0.0
         bit_depth = self._bit_depth_from_subtype(subtype)
 
         logger.debug(
@@ -239,34 +386,56 @@ class AudioQualityChecker:
             logger.warning(error_msg, extra={"session_id": session_id})
             raise ValueError(error_msg)
 
-        block_frames = max(sample_rate // 2, 4096)  # roughly 0.5s per block
+        # Analyse integer samples directly rather than materialising a float32
+        # copy of every block. Channels are summed instead of averaged, so the
+        # thresholds are scaled by the channel count to compare like-for-like.
+        # Rounding the thresholds up keeps the comparisons exact for integer
+        # magnitudes and lets NumPy compare without promoting to float.
+        full_scale = self._int_full_scale
+        silence_int = math.ceil(self._silence_linear_threshold * full_scale * channels)
+        clip_int = math.ceil(self.CLIPPING_THRESHOLD * full_scale * channels)
 
         total_samples = 0
         silence_samples = 0
-        sum_squares = 0.0
+        sum_squares = 0
         clipping_detected = False
         clipping_samples = 0
 
-        while True:
-            block = audio_file.read(block_frames, dtype="float32", always_2d=True)
-            if block.size == 0:
-                break
-
-            # Convert multi-channel audio to mono for aggregate checks
-            block_mono = block.mean(axis=1, dtype=np.float32)
-            abs_block = np.abs(block_mono)
-
-            total_samples += block_mono.size
-            silence_samples += int(np.sum(abs_block < self._silence_linear_threshold))
-            sum_squares += float(np.sum(block_mono ** 2))
-
-            # Count samples at/above clipping threshold; require sustained ratio later
-            clipping_samples += int(np.sum(abs_block >= self.CLIPPING_THRESHOLD))
+        # Scratch buffers reused across blocks; local to this call so the
+        # checker stays safe to share between worker threads
+        mono_buf = np.empty(0, dtype=np.int64)
+        abs_buf = np.empty(0, dtype=np.int64)
+        mask_buf = np.empty(0, dtype=bool)
+
+        for block in blocks:
+            n = block.shape[0]
+            if n > mono_buf.size:
+                mono_buf = np.empty(n, dtype=np.int64)
+                abs_buf = np.empty(n, dtype=np.int64)
+                mask_buf = np.empty(n, dtype=bool)
+
+            # Sum multi-channel audio to mono in int64 to avoid overflow
+            block_mono = block.sum(axis=1, dtype=np.int64, out=mono_buf[:n])
+
+            total_samples += n
+            abs_block = np.abs(block_mono, out=abs_buf[:n])
+            silence_samples += int(np.count_nonzero(
+                np.less(abs_block, silence_int, out=mask_buf[:n])
+            ))
+            sum_squares += int(np.dot(block_mono, block_mono))
+
+            # Most blocks never reach the clipping threshold: one allocation-free
+            # reduction rules that out before counting samples individually
+            if abs_block.max() >= clip_int:
+                # Count samples at/above clipping threshold; require sustained ratio later
+                clipping_samples += int(np.count_nonzero(
+                    np.greater_equal(abs_block, clip_int, out=mask_buf[:n])
+                ))
 
         if total_samples == 0:
             raise ValueError("Audio file contained no samples")
 
-        rms = np.sqrt(sum_squares / total_samples)
+        rms = np.sqrt(sum_squares / total_samples) / (full_scale * channels)
         rms_db = 20 * np.log10(max(rms, 1e-10))
         silence_percent = (silence_samples / total_samples) * 100.0
         volume_ok = -40 <= rms_db <= -6
@@ -10,7 +10,6 @@ import os
 from typing import List, Dict, Any, Optional
 
 import numpy as np
-from sklearn.cluster import DBSCAN, KMeans
 
 logger = logging.getLogger(__name__)
 
@@ -94,6 +93,10 @@ class FeedbackClusterer:
             feedback_texts = [r["feedback_text"] for r in results]
             votes = [r["vote"] for r in results]
 
+            # scikit-learn pulls in scipy; import on first use so the verifier
+            # process doesn't pay for it at startup
+            from sklearn.cluster import DBSCAN, KMeans
+
             # Cluster using chosen method
             if method == "dbscan":
                 clusterer = DBSCAN(eps=eps, min_samples=min_samples, metric="cosine")
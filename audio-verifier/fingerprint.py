@@ -4,28 +4,145 @@ Uses Chromaprint and AcoustID to detect copyrighted music
 """
 
 import asyncio
+import concurrent.futures
+import contextlib
+import hashlib
 import os
+import re
+import shutil
+import subprocess
 import tempfile
-from typing import Any, Dict, Iterable, Optional
+import threading
+import time
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple
 
 import acoustid
+import httpx
+
+from audio_checker import DecodedAudio
+
+# AcoustID lookups are cached per fingerprint: re-uploads and retries of the
+# same recording produce identical Chromaprint fingerprints
+LOOKUP_CACHE_TTL = 3600  # seconds
+LOOKUP_CACHE_MAX_ENTRIES = 1024
+
+# PCM format requested from ffmpeg for fingerprinting: Chromaprint resamples
+# to 11025 Hz mono internally, so decoding straight to it skips that work
+FINGERPRINT_SAMPLE_RATE = 11025
+PCM_CHUNK_SIZE = 64 * 1024  # bytes read from ffmpeg per Chromaprint feed
+
+# AcoustID identifies recordings from their opening seconds, so only this much
+# audio is decoded and fingerprinted; lookups still send the full duration
+FINGERPRINT_MAX_SECONDS = 30
+FFMPEG_DURATION_PATTERN = re.compile(rb"Duration: (\d+):(\d{2}):(\d{2}(?:\.\d+)?)")
+
+ACOUSTID_LOOKUP_URL = "https://api.acoustid.org/v2/lookup"
+ACOUSTID_TIMEOUT = 10.0  # seconds
+
+
+# Known fingerprinting failures and the message reported for each; checked in
+# order, so subclasses (NoBackendError) must precede their bases
+ERROR_MESSAGES = {
+    acoustid.NoBackendError: "Chromaprint not installed - copyright check skipped",
+    acoustid.FingerprintGenerationError: "Could not generate audio fingerprint",
+}
+
+
+class FfmpegDecodeError(Exception):
+    """ffmpeg could not decode the upload from a pipe."""
+
+
+async def acoustid_lookup(
+    apikey: str,
+    fingerprint: Any,
+    duration: float,
+    client: Optional[httpx.AsyncClient] = None,
+) -> Dict[str, Any]:
+    """
+    Look up a fingerprint with the AcoustID web service without blocking.
+
+    Async equivalent of acoustid.lookup; raises acoustid.WebServiceError on
+    an error response. Uses a one-off client when none is shared.
+    """
+    if isinstance(fingerprint, bytes):
+        fingerprint = fingerprint.decode("ascii")
+    data = {
+        "format": "json",
+        "client": apikey,
+        "duration": int(duration),
+        "fingerprint": fingerprint,
+        "meta": "recordings",
+    }
+
+    if client is None:
+        async with httpx.AsyncClient(timeout=ACOUSTID_TIMEOUT) as one_off_client:
+            response = await one_off_client.post(ACOUSTID_LOOKUP_URL, data=data)
+    else:
+        response = await client.post(ACOUSTID_LOOKUP_URL, data=data, timeout=ACOUSTID_TIMEOUT)
+
+    try:
+        payload = response.json()
+    except ValueError:
+        raise acoustid.WebServiceError(f"HTTP {response.status_code}: response is not valid JSON")
+    if payload.get("status") != "ok":
+        message = payload.get("error", {}).get("message", f"HTTP {response.status_code}")
+        raise acoustid.WebServiceError(message)
+    return payload
 
 
 class CopyrightDetector:
     """Detects copyrighted audio using acoustic fingerprinting."""
 
-    def __init__(self, acoustid_api_key: Optional[str] = None):
+    def __init__(
+        self,
+        acoustid_api_key: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        executor: Optional[concurrent.futures.Executor] = None,
+        cpu_slots: Optional[asyncio.Semaphore] = None,
+    ):
         """
         Args:
             acoustid_api_key: AcoustID API key (optional, uses test key if not provided)
+            http_client: Shared client for AcoustID lookups (optional, a
+                one-off client is used per lookup if not provided)
+            executor: Shared pool to fingerprint on (optional, the loop's
+                default executor is used if not provided)
+            cpu_slots: Process-wide cap on concurrent CPU-heavy jobs, shared
+                with the quality checker's decoding (optional, uncapped)
         """
         self.api_key = acoustid_api_key or "test"
+        self.http_client = http_client
         self.confidence_threshold = 0.8  # 80% match threshold
+        # Prefer the native fpcalc tool when installed: it decodes the upload
+        # itself instead of streaming PCM through audioread into Python
+        self.use_fpcalc = shutil.which(os.environ.get("FPCALC", "fpcalc")) is not None
+        self.ffmpeg_path = shutil.which("ffmpeg")
+        # Owned by the app (see main.lifespan), so the detector never shuts them down
+        self.executor = executor
+        self.cpu_slots = cpu_slots
+        # fingerprint key -> (cached_at, parsed matches); misses are cached too
+        self._lookup_cache: Dict[str, Tuple[float, List[tuple[float, str, str, str]]]] = {}
 
-    async def check_copyright(self, audio_bytes: bytes) -> Dict[str, Any]:
+    async def check_copyright(
+        self, audio_bytes: bytes, decoded: Optional[DecodedAudio] = None
+    ) -> Dict[str, Any]:
         """
-        Legacy API: analyze audio from bytes by spilling to a temp file.
+        Legacy API: analyze audio from bytes.
+
+        With the Chromaprint library available, fingerprints decoded PCM the
+        caller already holds, or else pipes the bytes through ffmpeg straight
+        into Chromaprint as it decodes. Otherwise spills to a temp file for fpcalc.
         """
+        if acoustid.have_chromaprint:
+            if decoded is not None:
+                return await self._check(self._fingerprint_decoded, decoded)
+
+            if self.ffmpeg_path:
+                try:
+                    return await self._check(self._fingerprint_ffmpeg_stream, audio_bytes)
+                except FfmpegDecodeError:
+                    pass
+
         with tempfile.NamedTemporaryFile(suffix=".tmp", delete=False) as temp_file:
             temp_file.write(audio_bytes)
             temp_path = temp_file.name
@@ -41,23 +158,164 @@ class CopyrightDetector:
         """
         Analyze audio directly from disk, generating a Chromaprint fingerprint.
         """
+        return await self._check(self._fingerprint_file, file_path)
+
+    async def _check(self, fingerprint_fn, source: Any) -> Dict[str, Any]:
         try:
-            lookup_results = await asyncio.to_thread(self._fingerprint_and_lookup, file_path)
+            # Fingerprinting is CPU/subprocess work; the lookup is plain network I/O
+            async with self.cpu_slots or contextlib.nullcontext():
+                duration, fingerprint = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, fingerprint_fn, source
+                )
+            lookup_results = await self._lookup(duration, fingerprint)
             return self._format_results(lookup_results)
-        except acoustid.NoBackendError:
-            return self._error_result("Chromaprint not installed - copyright check skipped")
-        except acoustid.FingerprintGenerationError:
-            return self._error_result("Could not generate audio fingerprint")
+        except FfmpegDecodeError:
+            raise
         except Exception as exc:
-            return self._error_result(f"AcoustID lookup failed: {exc}")
+            message = next(
+                (msg for exc_type, msg in ERROR_MESSAGES.items() if isinstance(exc, exc_type)),
+                f"AcoustID lookup failed: {exc}",
+            )
+            return self._error_result(message)
+
+    def _fingerprint_file(self, file_path: str) -> Tuple[float, Any]:
+        return acoustid.fingerprint_file(
+            file_path, force_fpcalc=self.use_fpcalc, maxlength=FINGERPRINT_MAX_SECONDS
+        )
+
+    def _fingerprint_ffmpeg_stream(self, audio_bytes: bytes) -> Tuple[float, Any]:
+        """
+        Decode through an ffmpeg pipe, feeding Chromaprint as PCM arrives.
 
-    def _fingerprint_and_lookup(self, file_path: str) -> Iterable[tuple[float, str, str, str]]:
-        duration, fingerprint = acoustid.fingerprint_file(file_path)
-        results = acoustid.lookup(
+        Raises FfmpegDecodeError if ffmpeg can't decode from a pipe (e.g. MP4
+        with a trailing moov atom) so the caller can fall back to a file.
+        """
+        proc = subprocess.Popen(
+            [
+                self.ffmpeg_path,
+                "-hide_banner",
+                "-nostats",
+                "-i", "pipe:0",
+                "-t", str(FINGERPRINT_MAX_SECONDS),
+                "-f", "s16le",
+                "-ac", "1",
+                "-ar", str(FINGERPRINT_SAMPLE_RATE),
+                "pipe:1",
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        writer = threading.Thread(target=self._write_stdin, args=(proc.stdin, audio_bytes), daemon=True)
+        writer.start()
+        # ffmpeg's input header on stderr carries the full duration; read it
+        # concurrently so a chatty decoder can't block on a full pipe
+        stderr_output: List[bytes] = []
+        stderr_reader = threading.Thread(
+            target=lambda: stderr_output.append(proc.stderr.read()), daemon=True
+        )
+        stderr_reader.start()
+
+        decoded_bytes = 0
+
+        def pcm_chunks():
+            nonlocal decoded_bytes
+            while chunk := proc.stdout.read(PCM_CHUNK_SIZE):
+                decoded_bytes += len(chunk)
+                yield chunk
+
+        chunks = pcm_chunks()
+        try:
+            try:
+                fingerprint = acoustid.fingerprint(FINGERPRINT_SAMPLE_RATE, 1, chunks)
+            except acoustid.FingerprintGenerationError:
+                fingerprint = None
+
+            # Let ffmpeg finish writing its (already time-limited) output and exit
+            for _ in chunks:
+                pass
+        except BaseException:
+            # Don't leave ffmpeg, or the threads blocked on its pipes, running
+            proc.kill()
+            raise
+        finally:
+            proc.stdout.close()
+            proc.wait()
+            writer.join()
+            stderr_reader.join()
+
+        if proc.returncode != 0 or decoded_bytes == 0:
+            raise FfmpegDecodeError(f"ffmpeg exited with status {proc.returncode}")
+        if fingerprint is None:
+            raise acoustid.FingerprintGenerationError("fingerprint calculation failed")
+
+        duration = self._parse_ffmpeg_duration(b"".join(stderr_output))
+        if duration is None:
+            # Without a header duration the decoded length is only the real
+            # length when ffmpeg hit end of input before the -t cap; a capped
+            # decode would send AcoustID a truncated duration, so use the file
+            decoded_seconds = decoded_bytes / (2 * FINGERPRINT_SAMPLE_RATE)
+            if decoded_seconds >= FINGERPRINT_MAX_SECONDS:
+                raise FfmpegDecodeError("ffmpeg reported no duration for a capped decode")
+            duration = decoded_seconds
+        return duration, fingerprint
+
+    @staticmethod
+    def _parse_ffmpeg_duration(stderr_output: bytes) -> Optional[float]:
+        # "N/A" for streams ffmpeg can't size from a pipe; no match then
+        match = FFMPEG_DURATION_PATTERN.search(stderr_output)
+        if match is None:
+            return None
+        hours, minutes, seconds = match.groups()
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    @staticmethod
+    def _write_stdin(stdin: BinaryIO, audio_bytes: bytes) -> None:
+        try:
+            stdin.write(audio_bytes)
+            stdin.close()
+        except (BrokenPipeError, OSError):
+            # ffmpeg exited early; its return code reports the failure
+            pass
+
+    def _fingerprint_decoded(self, decoded: DecodedAudio) -> Tuple[float, Any]:
+        # Chromaprint takes interleaved int16 PCM, which is the row-major layout
+        # of the decoded (frames, channels) array
+        block_frames = decoded.sample_rate * 10
+        samples = decoded.samples[:decoded.sample_rate * FINGERPRINT_MAX_SECONDS]
+        pcm_blocks = (
+            samples[i:i + block_frames].tobytes()
+            for i in range(0, len(samples), block_frames)
+        )
+        fingerprint = acoustid.fingerprint(decoded.sample_rate, decoded.channels, pcm_blocks)
+        return decoded.duration, fingerprint
+
+    async def _lookup(self, duration: float, fingerprint: Any) -> List[tuple[float, str, str, str]]:
+        fingerprint_bytes = fingerprint if isinstance(fingerprint, bytes) else str(fingerprint).encode()
+        cache_key = f"{int(duration)}:{hashlib.blake2b(fingerprint_bytes, digest_size=16).hexdigest()}"
+        now = time.monotonic()
+
+        cached = self._lookup_cache.get(cache_key)
+        if cached is not None and now - cached[0] < LOOKUP_CACHE_TTL:
+            return cached[1]
+
+        results = await acoustid_lookup(
             self.api_key,
             fingerprint,
             duration,
+            client=self.http_client,
         )
+        matches = list(self._parse_lookup_results(results))
+
+        # Re-insert rather than assign, so a refreshed entry moves to the end
+        self._lookup_cache.pop(cache_key, None)
+        self._lookup_cache[cache_key] = (now, matches)
+        if len(self._lookup_cache) > LOOKUP_CACHE_MAX_ENTRIES:
+            # Dicts keep insertion order, so the first key is the oldest entry
+            self._lookup_cache.pop(next(iter(self._lookup_cache)))
+        return matches
+
+    def _parse_lookup_results(self, results: Any) -> Iterable[tuple[float, str, str, str]]:
         # Parse raw results: extract (score, recording_id, title, artist) tuples
         if isinstance(results, list):
             # Tests may mock lookup to return simplified tuple list
@@ -25,10 +25,12 @@ import json
 import logging
 import tempfile
 import asyncio
+import concurrent.futures
 import mimetypes
-from typing import Dict, Any, Optional, List, TypedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Any, Optional, List, TypedDict
 
-from audio_checker import AudioQualityChecker
+from audio_checker import AudioQualityChecker, DecodedAudio, decode_audio
 from fingerprint import CopyrightDetector
 from session_store import SessionStore
 from verification_pipeline import VerificationPipeline
@@ -49,11 +51,23 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    await validate_environment()
+    await open_shared_resources()
+    try:
+        yield
+    finally:
+        await close_shared_resources()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="SONAR Audio Verifier",
     description="Comprehensive audio verification: quality, copyright, transcription, and AI analysis",
     version="2.0.0",
+    lifespan=lifespan,
 )
 
 # Environment configuration
@@ -115,7 +129,6 @@ app.add_middleware(
 
 
 # Startup validation: Check required environment variables at application startup
-@app.on_event("startup")
 async def validate_environment():
     """
     Validate required environment variables at application startup.
@@ -183,6 +196,48 @@ _feedback_indexer: Optional[FeedbackIndexer] = None
 _feedback_clusterer: Optional[FeedbackClusterer] = None
 _quality_checker = AudioQualityChecker()
 _copyright_detector = CopyrightDetector(ACOUSTID_API_KEY)
+_http_client: Optional[httpx.AsyncClient] = None
+_fingerprint_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+# Caps concurrent legacy quality + copyright checks (each may spawn ffmpeg/fpcalc)
+_legacy_check_slots = asyncio.Semaphore(os.cpu_count() or 4)
+
+
+async def open_shared_resources():
+    """
+    Create the process-wide resources the checkers share: the HTTP client
+    (pooled connections), the fingerprinting pool and the CPU job cap.
+    """
+    global _http_client, _fingerprint_executor
+    cpu_count = os.cpu_count() or 1
+    _http_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=32),
+    )
+    _fingerprint_executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=cpu_count, thread_name_prefix="fingerprint"
+    )
+    # Fingerprinting and quality decoding (each may run ffmpeg) draw from one
+    # cap so together they can't oversubscribe the cores
+    cpu_slots = asyncio.Semaphore(cpu_count)
+    _copyright_detector.http_client = _http_client
+    _copyright_detector.executor = _fingerprint_executor
+    _copyright_detector.cpu_slots = cpu_slots
+    _quality_checker.cpu_slots = cpu_slots
+
+
+async def close_shared_resources():
+    """Close the shared HTTP client and fingerprinting pool."""
+    global _http_client, _fingerprint_executor
+    _copyright_detector.http_client = None
+    _copyright_detector.executor = None
+    _copyright_detector.cpu_slots = None
+    _quality_checker.cpu_slots = None
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+    if _fingerprint_executor is not None:
+        # Already-queued fingerprints finish; the detectors no longer submit here
+        _fingerprint_executor.shutdown(wait=False)
+        _fingerprint_executor = None
 
 
 async def run_database_migrations():
@@ -403,8 +458,13 @@ def get_verification_pipeline() -> VerificationPipeline:
                 detail="OpenRouter API not configured (OPENROUTER_API_KEY required)",
             )
         session_store = get_session_store()
+        # Reuse the app's checkers so they run on the shared client, pool and CPU cap
         _verification_pipeline = VerificationPipeline(
-            session_store, OPENROUTER_API_KEY, ACOUSTID_API_KEY
+            session_store,
+            OPENROUTER_API_KEY,
+            ACOUSTID_API_KEY,
+            quality_checker=_quality_checker,
+            copyright_detector=_copyright_detector,
         )
         logger.info("Initialized verification pipeline with PostgreSQL backend")
     return _verification_pipeline
@@ -1584,6 +1644,55 @@ async def get_feedback_stats():
         raise HTTPException(status_code=500, detail="Failed to get feedback stats")
 
 
+async def _decode_for_legacy_checks(audio_bytes: bytes) -> Optional[DecodedAudio]:
+    """
+    Decode legacy uploads once so the quality and copyright checks share the PCM.
+
+    Returns None when libsndfile can't read the container; both checks then
+    fall back to their own bytes-based decoding.
+    """
+    try:
+        return await asyncio.to_thread(decode_audio, audio_bytes)
+    except Exception as e:
+        logger.debug(f"Shared decode unavailable, checks will decode separately: {e}")
+        return None
+
+
+async def _run_legacy_checks(
+    audio_bytes: bytes,
+) -> tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Run the quality and copyright checks concurrently over the same upload.
+
+    A failure in one check is reported in its result instead of cancelling
+    the other. Concurrent requests are capped so decoder and fingerprint
+    subprocesses can't pile up under load.
+    """
+    async with _legacy_check_slots:
+        decoded = await _decode_for_legacy_checks(audio_bytes)
+        quality_result, copyright_result = await asyncio.gather(
+            _quality_checker.check_audio(decoded or audio_bytes),
+            _copyright_detector.check_copyright(audio_bytes, decoded=decoded),
+            return_exceptions=True,
+        )
+
+    if isinstance(quality_result, Exception):
+        logger.error(f"Legacy quality check failed: {quality_result}")
+        quality_result = {"quality": None, "errors": [f"Quality check failed: {quality_result}"]}
+    if isinstance(copyright_result, Exception):
+        logger.error(f"Legacy copyright check failed: {copyright_result}")
+        copyright_result = {
+            "copyright": {
+                "checked": False,
+                "detected": False,
+                "confidence": 0.0,
+                "matches": [],
+                "error": f"Copyright check failed: {copyright_result}",
+            }
+        }
+    return quality_result, copyright_result
+
+
 # Legacy endpoints (kept for backward compatibility)
 @app.post("/check-audio")
 async def check_audio(file: UploadFile = File(...)):
@@ -1598,11 +1707,7 @@ async def check_audio(file: UploadFile = File(...)):
         if not audio_bytes:
             raise HTTPException(status_code=400, detail="Empty file uploaded")
 
-        # Run quality checks
-        quality_result = await _quality_checker.check_audio(audio_bytes)
-
-        # Run copyright detection
-        copyright_result = await _copyright_detector.check_copyright(audio_bytes)
+        quality_result, copyright_result = await _run_legacy_checks(audio_bytes)
 
         # Combine results
         quality = quality_result.get("quality", {})
@@ -1654,21 +1759,20 @@ async def check_audio_url(url: str):
 
     For new integrations, use POST /verify instead.
     """
+    # Opened by the lifespan handler; absent when the app runs without lifespan events
+    if _http_client is None:
+        raise HTTPException(status_code=503, detail="HTTP client not initialized")
+
     try:
-        # Download audio from URL
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, timeout=30.0)
-            response.raise_for_status()
-            audio_bytes = response.content
+        # Download audio from URL over the shared, pooled client
+        response = await _http_client.get(url, timeout=30.0)
+        response.raise_for_status()
+        audio_bytes = response.content
 
         if not audio_bytes:
             raise HTTPException(status_code=400, detail="Empty file from URL")
 
-        # Run quality checks
-        quality_result = await _quality_checker.check_audio(audio_bytes)
-
-        # Run copyright detection
-        copyright_result = await _copyright_detector.check_copyright(audio_bytes)
+        quality_result, copyright_result = await _run_legacy_checks(audio_bytes)
 
         # Combine results
         quality = quality_result.get("quality", {})
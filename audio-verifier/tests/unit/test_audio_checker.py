@@ -4,11 +4,14 @@ Expanded unit tests for audio_checker.py
 Tests quality checks: duration, sample rate, clipping, silence, and volume levels.
 """
 
+import asyncio
+import io
+
 import numpy as np
 import pytest
 import soundfile as sf
 
-from audio_checker import AudioQualityChecker
+from audio_checker import AudioQualityChecker, decode_audio
 
 
 class TestAudioCheckerBasic:
@@ -39,6 +42,26 @@ class TestAudioCheckerBasic:
         assert any("Too much silence" in err for err in result["errors"])
 
 
+    @pytest.mark.asyncio
+    async def test_analysis_holds_shared_cpu_slot(self, valid_audio_file):
+        """Test that file analysis runs inside the shared CPU job cap."""
+        checker = AudioQualityChecker()
+        checker.cpu_slots = asyncio.Semaphore(1)
+        analyze_file = checker._analyze_file
+        slot_held = []
+
+        def analyze(file_path, session_id):
+            slot_held.append(checker.cpu_slots.locked())
+            return analyze_file(file_path, session_id)
+
+        checker._analyze_file = analyze
+        result = await checker.check_audio_file(str(valid_audio_file))
+
+        assert result["quality"]["passed"] is True
+        assert slot_held == [True]
+        assert not checker.cpu_slots.locked()
+
+
 class TestDurationValidation:
     """Test duration-based quality checks."""
 
@@ -146,6 +169,29 @@ class TestSilenceDetection:
         # Clean audio should have <30% silence
         assert result["quality"]["silence_percent"] < 30
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("sample_rate,frequency", [
+        (48000, 1000),
+        (48000, 3000),
+        (48000, 6000),
+        (44100, 6300),
+    ])
+    async def test_pure_tone_silence_and_rms(self, tmp_path, sample_rate, frequency):
+        """Every sample counts: tones must not alias into silence."""
+        t = np.arange(2 * sample_rate) / sample_rate
+        waveform = (0.3 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+        audio_path = tmp_path / "tone.wav"
+        sf.write(audio_path, waveform, sample_rate, subtype="PCM_16")
+
+        checker = AudioQualityChecker()
+        quality = (await checker.check_audio_file(str(audio_path)))["quality"]
+
+        expected_rms_db = 20 * np.log10(0.3 / np.sqrt(2))
+        assert quality["rms_db"] == pytest.approx(expected_rms_db, abs=0.1)
+        # Only the samples at or next to zero crossings count as silent
+        assert quality["silence_percent"] < checker.MAX_SILENCE_PERCENT
+        assert quality["passed"] is True
+
 
 class TestVolumeValidation:
     """Test volume level checks."""
@@ -260,6 +306,31 @@ class TestMultiFormatSupport:
         result = await checker.check_audio_file(str(audio_path_16))
         assert result["quality"]["passed"] is True
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("extension,subtype", [
+        ("wav", "FLOAT"),
+        ("wav", "DOUBLE"),
+        ("aiff", "FLOAT"),
+    ])
+    async def test_float_subtypes_match_pcm16(self, tmp_path, extension, subtype):
+        """Float samples are scaled, not truncated, before analysis."""
+        sample_rate = 16000
+        t = np.arange(2 * sample_rate) / sample_rate
+        waveform = (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+        pcm_path = tmp_path / f"pcm16.{extension}"
+        float_path = tmp_path / f"float.{extension}"
+        sf.write(pcm_path, waveform, sample_rate, subtype="PCM_16")
+        sf.write(float_path, waveform, sample_rate, subtype=subtype)
+
+        checker = AudioQualityChecker()
+        pcm = (await checker.check_audio_file(str(pcm_path)))["quality"]
+        flt = (await checker.check_audio_file(str(float_path)))["quality"]
+
+        assert flt["passed"] is pcm["passed"] is True
+        assert flt["rms_db"] == pytest.approx(pcm["rms_db"], abs=0.05)
+        assert flt["silence_percent"] == pytest.approx(pcm["silence_percent"], abs=0.05)
+        assert flt["clipping_percent"] == pcm["clipping_percent"]
+
 
 class TestStreamingPerformance:
     """Test streaming and performance characteristics."""
@@ -323,6 +394,78 @@ class TestByteProcessing:
         assert result_file["quality"]["passed"] == result_bytes["quality"]["passed"]
         assert pytest.approx(result_file["quality"]["duration"], rel=0.01) == result_bytes["quality"]["duration"]
 
+    @pytest.mark.asyncio
+    async def test_undecodable_bytes_fall_back_to_file_path(self):
+        """Test that bytes libsndfile rejects are routed through the file-based fallback."""
+        checker = AudioQualityChecker()
+
+        result = await checker.check_audio(b"X" * 32)
+
+        # Tiny blob is rejected by the file path's size probe rather than raising
+        assert result["quality"] is None
+        assert result["failure_reason"] == "format_probe_failed"
+
+    @pytest.mark.asyncio
+    async def test_check_audio_accepts_memoryview_and_file_object(self, valid_audio_file):
+        """Test that buffers and open file objects are analyzed without copying to bytes."""
+        audio_bytes = valid_audio_file.read_bytes()
+        checker = AudioQualityChecker()
+
+        result_bytes = await checker.check_audio(audio_bytes)
+        result_view = await checker.check_audio(memoryview(audio_bytes))
+        with open(valid_audio_file, "rb") as fh:
+            result_file = await checker.check_audio(fh)
+
+        assert result_view["quality"] == result_bytes["quality"]
+        assert result_file["quality"] == result_bytes["quality"]
+
+    @pytest.mark.asyncio
+    async def test_check_audio_accepts_decoded_audio(self, valid_audio_file):
+        """Test that pre-decoded PCM gives the same result as raw bytes."""
+        audio_bytes = valid_audio_file.read_bytes()
+        decoded = decode_audio(audio_bytes)
+
+        checker = AudioQualityChecker()
+        result_bytes = await checker.check_audio(audio_bytes)
+        result_decoded = await checker.check_audio(decoded)
+
+        assert decoded.samples.dtype == np.int16
+        assert result_decoded["quality"] == result_bytes["quality"]
+
+    @pytest.mark.parametrize("subtype", ["FLOAT", "DOUBLE"])
+    def test_decode_audio_scales_float_subtypes(self, subtype):
+        """Float WAVs decode to the same int16 PCM as their PCM_16 version."""
+        sample_rate = 16000
+        t = np.arange(sample_rate) / sample_rate
+        waveform = (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+        def encode(target_subtype):
+            buf = io.BytesIO()
+            sf.write(buf, waveform, sample_rate, format="WAV", subtype=target_subtype)
+            return buf.getvalue()
+
+        pcm = decode_audio(encode("PCM_16"))
+        flt = decode_audio(encode(subtype))
+
+        assert flt.samples.dtype == np.int16
+        assert flt.subtype == subtype
+        diff = np.abs(flt.samples.astype(np.int32) - pcm.samples.astype(np.int32))
+        assert diff.max() <= 1
+
+    @pytest.mark.asyncio
+    async def test_check_audio_batch_preserves_order(self, valid_audio_file, silent_audio_file):
+        """Test that batch analysis matches per-blob results in input order."""
+        valid_bytes = valid_audio_file.read_bytes()
+        silent_bytes = silent_audio_file.read_bytes()
+
+        checker = AudioQualityChecker()
+        results = await checker.check_audio_batch([valid_bytes, silent_bytes, valid_bytes])
+
+        assert len(results) == 3
+        assert results[0]["quality"]["passed"] is True
+        assert results[1]["quality"]["passed"] is False
+        assert results[2] == results[0]
+
 
 class TestSessionIDLogging:
     """Test session ID support in logging."""
@@ -4,11 +4,26 @@ Expanded unit tests for fingerprint.py
 Tests copyright detection via Chromaprint/AcoustID fingerprinting.
 """
 
+import asyncio
+import concurrent.futures
+import io
+import threading
+import urllib.parse
+
+import httpx
 import pytest
 from unittest.mock import patch, MagicMock, AsyncMock
 import acoustid
+import numpy as np
 
-from fingerprint import CopyrightDetector
+from audio_checker import DecodedAudio
+from fingerprint import (
+    FINGERPRINT_MAX_SECONDS,
+    LOOKUP_CACHE_TTL,
+    PCM_CHUNK_SIZE,
+    CopyrightDetector,
+    acoustid_lookup,
+)
 
 
 class TestCopyrightDetectorInit:
@@ -30,12 +45,43 @@ class TestCopyrightDetectorInit:
         detector = CopyrightDetector()
         assert detector.confidence_threshold == 0.8
 
+    @patch('fingerprint.shutil.which', return_value="/usr/bin/fpcalc")
+    def test_prefers_fpcalc_when_installed(self, mock_which):
+        """Test that fpcalc is forced when the binary is on PATH."""
+        assert CopyrightDetector().use_fpcalc is True
+
+    @patch('fingerprint.shutil.which', return_value=None)
+    def test_falls_back_without_fpcalc(self, mock_which):
+        """Test that the library backend is used when fpcalc is missing."""
+        assert CopyrightDetector().use_fpcalc is False
+
+    @pytest.mark.asyncio
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
+    async def test_fingerprints_on_shared_pool_within_cpu_slots(self, mock_lookup):
+        """Test that fingerprinting runs on the given pool while holding a CPU slot."""
+        mock_lookup.return_value = []
+        cpu_slots = asyncio.Semaphore(1)
+        seen = {}
+
+        def fingerprint_fn(source):
+            seen["thread"] = threading.current_thread().name
+            seen["slot_held"] = cpu_slots.locked()
+            return 120, "fingerprint-data"
+
+        with concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix="shared") as pool:
+            detector = CopyrightDetector(executor=pool, cpu_slots=cpu_slots)
+            await detector._check(fingerprint_fn, b"audio-data")
+
+        assert seen["thread"].startswith("shared")
+        assert seen["slot_held"] is True
+        assert not cpu_slots.locked()
+
 
 class TestCopyrightDetection:
     """Test copyright detection logic."""
 
     @pytest.mark.asyncio
-    @patch('fingerprint.acoustid.lookup')
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
     @patch('fingerprint.acoustid.fingerprint_file')
     async def test_high_confidence_match_detected(self, mock_fingerprint, mock_lookup):
         """Test that high-confidence matches (>80%) are detected."""
@@ -54,7 +100,7 @@ class TestCopyrightDetection:
         assert result["copyright"]["matches"][0]["title"] == "Copyrighted Song"
 
     @pytest.mark.asyncio
-    @patch('fingerprint.acoustid.lookup')
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
     @patch('fingerprint.acoustid.fingerprint_file')
     async def test_low_confidence_match_ignored(self, mock_fingerprint, mock_lookup):
         """Test that low-confidence matches (<80%) are ignored."""
@@ -72,7 +118,7 @@ class TestCopyrightDetection:
         assert len(result["copyright"]["matches"]) == 0
 
     @pytest.mark.asyncio
-    @patch('fingerprint.acoustid.lookup')
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
     @patch('fingerprint.acoustid.fingerprint_file')
     async def test_no_match_passes_copyright_check(self, mock_fingerprint, mock_lookup):
         """Test that no matches result in copyright passed."""
@@ -88,7 +134,7 @@ class TestCopyrightDetection:
         assert len(result["copyright"]["matches"]) == 0
 
     @pytest.mark.asyncio
-    @patch('fingerprint.acoustid.lookup')
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
     @patch('fingerprint.acoustid.fingerprint_file')
     async def test_multiple_matches_sorted_by_confidence(self, mock_fingerprint, mock_lookup):
         """Test that multiple matches are returned with highest confidence first."""
@@ -104,11 +150,11 @@ class TestCopyrightDetection:
         
         assert result["copyright"]["detected"] is True
         assert len(result["copyright"]["matches"]) == 2  # Only >=0.8
-        # Matches returned by acoustid.lookup should maintain order
+        # Matches returned by acoustid_lookup should maintain order
         assert result["copyright"]["matches"][0]["confidence"] == 0.85
 
     @pytest.mark.asyncio
-    @patch('fingerprint.acoustid.lookup')
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
     @patch('fingerprint.acoustid.fingerprint_file')
     async def test_max_5_matches_returned(self, mock_fingerprint, mock_lookup):
         """Test that at most 5 matches are returned."""
@@ -125,7 +171,7 @@ class TestCopyrightDetection:
         assert len(result["copyright"]["matches"]) <= 5
 
     @pytest.mark.asyncio
-    @patch('fingerprint.acoustid.lookup')
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
     @patch('fingerprint.acoustid.fingerprint_file')
     async def test_boundary_confidence_exactly_80_percent(self, mock_fingerprint, mock_lookup):
         """Test boundary case: exactly 80% confidence."""
@@ -142,7 +188,7 @@ class TestCopyrightDetection:
         assert len(result["copyright"]["matches"]) == 1
 
     @pytest.mark.asyncio
-    @patch('fingerprint.acoustid.lookup')
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
     @patch('fingerprint.acoustid.fingerprint_file')
     async def test_boundary_confidence_just_below_80_percent(self, mock_fingerprint, mock_lookup):
         """Test boundary case: just below 80% confidence."""
@@ -170,7 +216,7 @@ class TestErrorHandling:
         
         detector = CopyrightDetector()
         
-        with patch('fingerprint.acoustid.lookup') as mock_lookup:
+        with patch('fingerprint.acoustid_lookup', new_callable=AsyncMock) as mock_lookup:
             mock_lookup.side_effect = Exception("Network error")
             result = await detector.check_copyright_from_path("/path/to/audio.wav")
         
@@ -184,7 +230,7 @@ class TestErrorHandling:
         
         with patch('fingerprint.acoustid.fingerprint_file') as mock_fingerprint:
             mock_fingerprint.return_value = (120, "fingerprint-data")
-            with patch('fingerprint.acoustid.lookup') as mock_lookup:
+            with patch('fingerprint.acoustid_lookup', new_callable=AsyncMock) as mock_lookup:
                 mock_lookup.side_effect = acoustid.WebServiceError("Invalid API key")
                 result = await detector.check_copyright_from_path("/path/to/audio.wav")
         
@@ -232,7 +278,7 @@ class TestTempFileHandling:
     """Test temporary file creation and cleanup."""
 
     @pytest.mark.asyncio
-    @patch('fingerprint.acoustid.lookup')
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
     @patch('fingerprint.acoustid.fingerprint_file')
     @patch('fingerprint.os.unlink')
     async def test_check_copyright_cleans_up_temp_file(self, mock_unlink, mock_fingerprint, mock_lookup):
@@ -261,7 +307,7 @@ class TestTempFileHandling:
         assert mock_unlink.called
 
     @pytest.mark.asyncio
-    @patch('fingerprint.acoustid.lookup')
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
     @patch('fingerprint.acoustid.fingerprint_file')
     async def test_check_copyright_from_path_does_not_delete_original(self, mock_fingerprint, mock_lookup, valid_audio_file):
         """Test that check_copyright_from_path does not delete the original file."""
@@ -282,7 +328,7 @@ class TestResultFormatting:
     """Test result formatting."""
 
     @pytest.mark.asyncio
-    @patch('fingerprint.acoustid.lookup')
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
     @patch('fingerprint.acoustid.fingerprint_file')
     async def test_result_structure(self, mock_fingerprint, mock_lookup):
         """Test that result has expected structure."""
@@ -301,7 +347,7 @@ class TestResultFormatting:
         assert "checked" in result["copyright"]
 
     @pytest.mark.asyncio
-    @patch('fingerprint.acoustid.lookup')
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
     @patch('fingerprint.acoustid.fingerprint_file')
     async def test_match_structure(self, mock_fingerprint, mock_lookup):
         """Test that match objects have expected structure."""
@@ -322,7 +368,7 @@ class TestResultFormatting:
         assert match["confidence"] == 0.95
 
     @pytest.mark.asyncio
-    @patch('fingerprint.acoustid.lookup')
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
     @patch('fingerprint.acoustid.fingerprint_file')
     async def test_unknown_title_and_artist_defaults(self, mock_fingerprint, mock_lookup):
         """Test that missing title/artist use 'Unknown' defaults."""
@@ -337,7 +383,7 @@ class TestResultFormatting:
         assert match["artist"] == "Unknown"
 
     @pytest.mark.asyncio
-    @patch('fingerprint.acoustid.lookup')
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
     @patch('fingerprint.acoustid.fingerprint_file')
     async def test_confidence_rounded_to_3_decimals(self, mock_fingerprint, mock_lookup):
         """Test that confidence scores are rounded to 3 decimal places."""
@@ -355,7 +401,7 @@ class TestFingerprintGeneration:
     """Test fingerprint generation behavior."""
 
     @pytest.mark.asyncio
-    @patch('fingerprint.acoustid.lookup')
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
     @patch('fingerprint.acoustid.fingerprint_file')
     async def test_fingerprint_called_with_correct_file(self, mock_fingerprint, mock_lookup):
         """Test that fingerprint is generated from correct file."""
@@ -365,10 +411,12 @@ class TestFingerprintGeneration:
         detector = CopyrightDetector()
         await detector.check_copyright_from_path("/path/to/audio.wav")
         
-        mock_fingerprint.assert_called_once_with("/path/to/audio.wav")
+        mock_fingerprint.assert_called_once_with(
+            "/path/to/audio.wav", force_fpcalc=detector.use_fpcalc, maxlength=FINGERPRINT_MAX_SECONDS
+        )
 
     @pytest.mark.asyncio
-    @patch('fingerprint.acoustid.lookup')
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
     @patch('fingerprint.acoustid.fingerprint_file')
     async def test_lookup_called_with_fingerprint_data(self, mock_fingerprint, mock_lookup):
         """Test that lookup is called with fingerprint and duration."""
@@ -385,11 +433,308 @@ class TestFingerprintGeneration:
         assert 120 in call_args[0]  # Duration
 
 
+class TestDecodedAudioFingerprinting:
+    """Test fingerprinting PCM that was already decoded for the quality check."""
+
+    @pytest.mark.asyncio
+    @patch('fingerprint.acoustid.have_chromaprint', True)
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
+    @patch('fingerprint.acoustid.fingerprint_file')
+    @patch('fingerprint.acoustid.fingerprint', create=True)
+    async def test_decoded_audio_skips_file_decode(self, mock_pcm_fingerprint, mock_file_fingerprint, mock_lookup):
+        """Test that decoded PCM is fingerprinted directly without a temp file."""
+        mock_pcm_fingerprint.return_value = "fingerprint-data"
+        mock_lookup.return_value = []
+        decoded = DecodedAudio(
+            samples=np.zeros((16000, 2), dtype=np.int16),
+            sample_rate=16000,
+            channels=2,
+            subtype="PCM_16",
+            duration=1.0,
+        )
+
+        detector = CopyrightDetector()
+        result = await detector.check_copyright(b"audio-data", decoded=decoded)
+
+        assert result["copyright"]["passed"] is True
+        assert not mock_file_fingerprint.called
+        sample_rate, channels, _ = mock_pcm_fingerprint.call_args[0]
+        assert (sample_rate, channels) == (16000, 2)
+        assert mock_lookup.call_args[0][2] == 1.0
+
+    @pytest.mark.asyncio
+    @patch('fingerprint.acoustid.have_chromaprint', False)
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
+    @patch('fingerprint.acoustid.fingerprint_file')
+    async def test_decoded_audio_without_chromaprint_uses_file(self, mock_fingerprint, mock_lookup):
+        """Test fallback to fpcalc on a temp file when libchromaprint is missing."""
+        mock_fingerprint.return_value = (120, "fingerprint-data")
+        mock_lookup.return_value = []
+        decoded = DecodedAudio(
+            samples=np.zeros((16000, 1), dtype=np.int16),
+            sample_rate=16000,
+            channels=1,
+            subtype="PCM_16",
+            duration=1.0,
+        )
+
+        detector = CopyrightDetector()
+        result = await detector.check_copyright(b"audio-data", decoded=decoded)
+
+        assert result["copyright"]["passed"] is True
+        assert mock_fingerprint.called
+
+
+class TestFfmpegPipeFingerprinting:
+    """Test streaming bytes through ffmpeg into Chromaprint without a temp file."""
+
+    def _mock_process(self, returncode, stdout, stderr=b""):
+        process = MagicMock()
+        process.stdout = io.BytesIO(stdout)
+        process.stderr = io.BytesIO(stderr)
+        process.returncode = returncode
+        return process
+
+    @pytest.mark.asyncio
+    @patch('fingerprint.acoustid.have_chromaprint', True)
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
+    @patch('fingerprint.acoustid.fingerprint_file')
+    @patch('fingerprint.acoustid.fingerprint', create=True)
+    async def test_streams_ffmpeg_output_into_chromaprint(self, mock_pcm_fingerprint, mock_file_fingerprint, mock_lookup):
+        """Test that ffmpeg PCM is fed to Chromaprint in chunks as it is read."""
+        fed_chunks = []
+
+        def consume(sample_rate, channels, chunks):
+            # Only consume the first chunk, like Chromaprint at its length cap
+            fed_chunks.append(next(chunks))
+            return "fingerprint-data"
+
+        mock_pcm_fingerprint.side_effect = consume
+        mock_lookup.return_value = []
+        pcm = b"\x00\x00" * 11025 * 10  # 10 seconds of mono s16le
+
+        detector = CopyrightDetector()
+        detector.ffmpeg_path = "/usr/bin/ffmpeg"
+        with patch('fingerprint.subprocess.Popen', return_value=self._mock_process(0, pcm)) as mock_popen:
+            result = await detector.check_copyright(b"audio-data")
+
+        assert result["copyright"]["passed"] is True
+        assert not mock_file_fingerprint.called
+        assert "pipe:0" in mock_popen.call_args[0][0]
+        assert len(fed_chunks[0]) == PCM_CHUNK_SIZE
+        # Input shorter than the decode cap: its decoded PCM length is exact
+        assert mock_lookup.call_args[0][2] == pytest.approx(10.0)
+        mock_popen.return_value.kill.assert_not_called()
+
+    @patch('fingerprint.acoustid.fingerprint', create=True)
+    def test_kills_ffmpeg_when_fingerprinting_raises(self, mock_pcm_fingerprint):
+        """Test that an unexpected Chromaprint error still reaps the ffmpeg child."""
+        mock_pcm_fingerprint.side_effect = MemoryError("chromaprint")
+        process = self._mock_process(None, b"\x00\x00" * 11025)
+
+        detector = CopyrightDetector()
+        detector.ffmpeg_path = "/usr/bin/ffmpeg"
+        with patch('fingerprint.subprocess.Popen', return_value=process):
+            with pytest.raises(MemoryError):
+                detector._fingerprint_ffmpeg_stream(b"audio-data")
+
+        process.kill.assert_called_once()
+        process.wait.assert_called_once()
+        assert process.stdout.closed
+
+    @pytest.mark.asyncio
+    @patch('fingerprint.acoustid.have_chromaprint', True)
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
+    @patch('fingerprint.acoustid.fingerprint', create=True)
+    async def test_trims_decode_but_looks_up_full_duration(self, mock_pcm_fingerprint, mock_lookup):
+        """Test that ffmpeg decodes only the opening seconds while lookup gets the real length."""
+        mock_pcm_fingerprint.return_value = "fingerprint-data"
+        mock_lookup.return_value = []
+        pcm = b"\x00\x00" * 11025 * FINGERPRINT_MAX_SECONDS
+        stderr = b"Input #0, mp3, from 'pipe:0':\n  Duration: 01:02:03.50, start: 0.000000, bitrate: 128 kb/s\n"
+
+        detector = CopyrightDetector()
+        detector.ffmpeg_path = "/usr/bin/ffmpeg"
+        with patch('fingerprint.subprocess.Popen', return_value=self._mock_process(0, pcm, stderr)) as mock_popen:
+            await detector.check_copyright(b"audio-data")
+
+        args = mock_popen.call_args[0][0]
+        assert args[args.index("-t") + 1] == str(FINGERPRINT_MAX_SECONDS)
+        assert mock_lookup.call_args[0][2] == pytest.approx(3723.5)
+
+    @pytest.mark.asyncio
+    @patch('fingerprint.acoustid.have_chromaprint', True)
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
+    @patch('fingerprint.acoustid.fingerprint_file')
+    @patch('fingerprint.acoustid.fingerprint', create=True)
+    async def test_unknown_duration_of_capped_decode_uses_file(self, mock_pcm_fingerprint, mock_file_fingerprint, mock_lookup):
+        """Test that a capped decode with "Duration: N/A" never looks up the truncated length."""
+        mock_pcm_fingerprint.return_value = "fingerprint-data"
+        mock_file_fingerprint.return_value = (3723.5, "fingerprint-data")
+        mock_lookup.return_value = []
+        pcm = b"\x00\x00" * 11025 * FINGERPRINT_MAX_SECONDS
+        stderr = b"Input #0, ogg, from 'pipe:0':\n  Duration: N/A, start: 0.000000, bitrate: N/A\n"
+
+        detector = CopyrightDetector()
+        detector.ffmpeg_path = "/usr/bin/ffmpeg"
+        with patch('fingerprint.subprocess.Popen', return_value=self._mock_process(0, pcm, stderr)):
+            result = await detector.check_copyright(b"audio-data")
+
+        assert result["copyright"]["passed"] is True
+        assert mock_file_fingerprint.called
+        assert mock_lookup.call_count == 1
+        assert mock_lookup.call_args[0][2] == pytest.approx(3723.5)
+
+    @pytest.mark.asyncio
+    @patch('fingerprint.acoustid.have_chromaprint', True)
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
+    @patch('fingerprint.acoustid.fingerprint_file')
+    @patch('fingerprint.acoustid.fingerprint', create=True)
+    async def test_falls_back_to_file_when_pipe_decode_fails(self, mock_pcm_fingerprint, mock_fingerprint, mock_lookup):
+        """Test that containers ffmpeg can't read from a pipe use the temp file."""
+        mock_pcm_fingerprint.side_effect = lambda sr, ch, chunks: list(chunks)
+        mock_fingerprint.return_value = (120, "fingerprint-data")
+        mock_lookup.return_value = []
+
+        detector = CopyrightDetector()
+        detector.ffmpeg_path = "/usr/bin/ffmpeg"
+        with patch('fingerprint.subprocess.Popen', return_value=self._mock_process(1, b"")):
+            result = await detector.check_copyright(b"audio-data")
+
+        assert result["copyright"]["passed"] is True
+        assert mock_fingerprint.called
+
+
+class TestAcoustidLookup:
+    """Test the async AcoustID web service call."""
+
+    def _client(self, handler):
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    @pytest.mark.asyncio
+    async def test_posts_fingerprint_with_shared_client(self):
+        """Test that the lookup posts the fingerprint form and returns the JSON body."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={"status": "ok", "results": []})
+
+        async with self._client(handler) as client:
+            payload = await acoustid_lookup("test-key", b"AQAA", 120.7, client=client)
+
+        assert payload == {"status": "ok", "results": []}
+        form = dict(urllib.parse.parse_qsl(requests[0].content.decode()))
+        assert form["client"] == "test-key"
+        assert form["fingerprint"] == "AQAA"
+        assert form["duration"] == "120"
+        assert form["meta"] == "recordings"
+
+    @pytest.mark.asyncio
+    async def test_error_status_raises_web_service_error(self):
+        """Test that an AcoustID error response raises WebServiceError."""
+        def handler(request):
+            return httpx.Response(
+                400, json={"status": "error", "error": {"code": 4, "message": "invalid API key"}}
+            )
+
+        async with self._client(handler) as client:
+            with pytest.raises(acoustid.WebServiceError, match="invalid API key"):
+                await acoustid_lookup("bad-key", "AQAA", 120, client=client)
+
+
+class TestLookupCache:
+    """Test caching of AcoustID lookups by fingerprint."""
+
+    @pytest.mark.asyncio
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
+    @patch('fingerprint.acoustid.fingerprint_file')
+    async def test_repeat_fingerprint_skips_lookup(self, mock_fingerprint, mock_lookup):
+        """Test that an identical fingerprint is answered from cache."""
+        mock_fingerprint.return_value = (120, "fingerprint-data")
+        mock_lookup.return_value = [(0.95, "id", "Song", "Artist")]
+
+        detector = CopyrightDetector()
+        first = await detector.check_copyright_from_path("/path/to/a.wav")
+        second = await detector.check_copyright_from_path("/path/to/b.wav")
+
+        assert mock_lookup.call_count == 1
+        assert first == second
+
+    @pytest.mark.asyncio
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
+    @patch('fingerprint.acoustid.fingerprint_file')
+    async def test_misses_are_cached(self, mock_fingerprint, mock_lookup):
+        """Test that fingerprints with no matches are not looked up again."""
+        mock_fingerprint.return_value = (120, "fingerprint-data")
+        mock_lookup.return_value = []
+
+        detector = CopyrightDetector()
+        await detector.check_copyright_from_path("/path/to/a.wav")
+        await detector.check_copyright_from_path("/path/to/a.wav")
+
+        assert mock_lookup.call_count == 1
+
+    @pytest.mark.asyncio
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
+    @patch('fingerprint.acoustid.fingerprint_file')
+    async def test_expired_entries_are_refreshed(self, mock_fingerprint, mock_lookup):
+        """Test that entries older than the TTL trigger a new lookup."""
+        mock_fingerprint.return_value = (120, "fingerprint-data")
+        mock_lookup.return_value = []
+
+        detector = CopyrightDetector()
+        with patch('fingerprint.time.monotonic', return_value=0.0):
+            await detector.check_copyright_from_path("/path/to/a.wav")
+        with patch('fingerprint.time.monotonic', return_value=LOOKUP_CACHE_TTL + 1.0):
+            await detector.check_copyright_from_path("/path/to/a.wav")
+
+        assert mock_lookup.call_count == 2
+
+    @pytest.mark.asyncio
+    @patch('fingerprint.LOOKUP_CACHE_MAX_ENTRIES', 2)
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
+    @patch('fingerprint.acoustid.fingerprint_file')
+    async def test_refreshed_entry_is_not_evicted_first(self, mock_fingerprint, mock_lookup):
+        """Test that eviction drops the oldest entry, not one just refreshed."""
+        mock_fingerprint.side_effect = lambda path, **kwargs: (120, path)
+        mock_lookup.return_value = []
+
+        detector = CopyrightDetector()
+        with patch('fingerprint.time.monotonic', return_value=0.0):
+            await detector.check_copyright_from_path("a")
+        with patch('fingerprint.time.monotonic', return_value=1.0):
+            await detector.check_copyright_from_path("b")
+        with patch('fingerprint.time.monotonic', return_value=LOOKUP_CACHE_TTL + 0.5):
+            await detector.check_copyright_from_path("a")  # expired: refreshed
+            await detector.check_copyright_from_path("c")  # evicts "b"
+            assert mock_lookup.call_count == 4
+            await detector.check_copyright_from_path("a")
+
+        assert mock_lookup.call_count == 4
+
+
+    @pytest.mark.asyncio
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
+    @patch('fingerprint.acoustid.fingerprint_file')
+    async def test_failed_lookups_are_not_cached(self, mock_fingerprint, mock_lookup):
+        """Test that network errors are retried on the next request."""
+        mock_fingerprint.return_value = (120, "fingerprint-data")
+        mock_lookup.side_effect = [acoustid.WebServiceError("down"), []]
+
+        detector = CopyrightDetector()
+        failed = await detector.check_copyright_from_path("/path/to/a.wav")
+        recovered = await detector.check_copyright_from_path("/path/to/a.wav")
+
+        assert failed["copyright"]["checked"] is False
+        assert recovered["copyright"]["checked"] is True
+
+
 class TestConfidenceThreshold:
     """Test confidence threshold behavior."""
 
     @pytest.mark.asyncio
-    @patch('fingerprint.acoustid.lookup')
+    @patch('fingerprint.acoustid_lookup', new_callable=AsyncMock)
     @patch('fingerprint.acoustid.fingerprint_file')
     async def test_custom_confidence_threshold(self, mock_fingerprint, mock_lookup):
         """Test that custom confidence thresholds can be set (if implemented)."""
@@ -1,5 +1,6 @@
 """Unit tests for main.py middleware and environment validation."""
 
+import asyncio
 import pytest
 from unittest.mock import patch, MagicMock, AsyncMock
 from fastapi.testclient import TestClient
@@ -169,6 +170,20 @@ async def test_dependency_get_verification_pipeline_requires_openrouter_key():
         assert exc_info.value.status_code == 500
 
 
+@pytest.mark.asyncio
+async def test_dependency_get_verification_pipeline_shares_copyright_detector():
+    """Test the pipeline reuses the app's checkers and so their shared resources."""
+    import main
+
+    with patch("main.OPENROUTER_API_KEY", "key"), \
+         patch("main._verification_pipeline", None), \
+         patch("main.get_session_store", return_value=MagicMock()):
+        pipeline = main.get_verification_pipeline()
+
+    assert pipeline.copyright_detector is main._copyright_detector
+    assert pipeline.quality_checker is main._quality_checker
+
+
 def test_upload_plaintext_to_walrus_missing_url():
     """Test upload_plaintext_to_walrus requires WALRUS_UPLOAD_URL."""
     from main import upload_plaintext_to_walrus
@@ -293,6 +308,54 @@ async def test_health_endpoint_config_status():
             assert "config" in data
 
 
+@pytest.mark.asyncio
+async def test_lifespan_owns_shared_http_client():
+    """Test the lifespan handler validates config and opens/closes the shared client."""
+    import main
+
+    with patch("main.validate_environment", AsyncMock()) as validate:
+        async with main.lifespan(main.app):
+            validate.assert_awaited_once()
+            assert main._http_client is not None
+            assert main._copyright_detector.http_client is main._http_client
+
+    assert main._http_client is None
+    assert main._copyright_detector.http_client is None
+
+
+@pytest.mark.asyncio
+async def test_lifespan_shares_pool_and_cpu_cap_across_restarts():
+    """Test each app run gets a fresh fingerprint pool shared by both checkers."""
+    import main
+
+    with patch("main.validate_environment", AsyncMock()), \
+         patch("main.os.cpu_count", return_value=3):
+        for _ in range(2):
+            async with main.lifespan(main.app):
+                pool = main._fingerprint_executor
+                assert pool._max_workers == 3
+                assert main._copyright_detector.executor is pool
+                assert main._copyright_detector.cpu_slots is main._quality_checker.cpu_slots
+                # A previous run's shutdown must not break this run's pool
+                assert await asyncio.wrap_future(pool.submit(lambda: "ok")) == "ok"
+            assert pool._shutdown
+            assert main._copyright_detector.executor is None
+
+
+@pytest.mark.asyncio
+async def test_check_audio_url_without_http_client_returns_503():
+    """Test /check-audio-url reports 503 when the lifespan handler hasn't run."""
+    from main import app
+
+    with patch("main._http_client", None):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/check-audio-url", params={"url": "http://localhost/blob"}
+            )
+            assert response.status_code == 503
+
+
 def test_encoded_blob_hex_validation():
     """Test that encryptedObjectBcsHex is properly hex-validated."""
     # Invalid hex should be rejected
@@ -309,3 +372,50 @@ def test_metadata_dict_validation():
     """Test that metadata dict is properly structured."""
     # Metadata should be a dict with expected keys
     assert True  # Placeholder
+
+
+@pytest.mark.asyncio
+async def test_legacy_checks_run_concurrently():
+    """Test that quality and copyright checks overlap instead of running back to back."""
+    import asyncio
+    import main
+
+    both_started = asyncio.Event()
+    started = []
+
+    async def check(name):
+        started.append(name)
+        if len(started) == 2:
+            both_started.set()
+        await asyncio.wait_for(both_started.wait(), timeout=1)
+        return {name: {"passed": True}}
+
+    async def check_quality(*args):
+        return await check("quality")
+
+    async def check_copyright(*args, **kwargs):
+        return await check("copyright")
+
+    with patch("main._decode_for_legacy_checks", AsyncMock(return_value=None)), \
+         patch.object(main._quality_checker, "check_audio", side_effect=check_quality), \
+         patch.object(main._copyright_detector, "check_copyright", side_effect=check_copyright):
+        quality_result, copyright_result = await main._run_legacy_checks(b"audio")
+
+    assert quality_result == {"quality": {"passed": True}}
+    assert copyright_result == {"copyright": {"passed": True}}
+
+
+@pytest.mark.asyncio
+async def test_legacy_check_failure_does_not_cancel_other_check():
+    """Test that one failing legacy check is reported without losing the other."""
+    import main
+
+    with patch("main._decode_for_legacy_checks", AsyncMock(return_value=None)), \
+         patch.object(main._quality_checker, "check_audio", AsyncMock(side_effect=RuntimeError("decoder crashed"))), \
+         patch.object(main._copyright_detector, "check_copyright",
+                      AsyncMock(return_value={"copyright": {"checked": True, "passed": True}})):
+        quality_result, copyright_result = await main._run_legacy_checks(b"audio")
+
+    assert quality_result["quality"] is None
+    assert "decoder crashed" in quality_result["errors"][0]
+    assert copyright_result == {"copyright": {"checked": True, "passed": True}}
@@ -410,6 +410,26 @@ class TestApprovalCalculation:
         assert approved is True
 
 
+    def test_quality_score_follows_checker_thresholds(self, mock_session_store):
+        """Test that the quality score uses the checker's current thresholds."""
+        pipeline = VerificationPipeline(
+            session_store=mock_session_store,
+            openrouter_api_key="test-key"
+        )
+        quality = {
+            "passed": True,
+            "duration": 60.0,
+            "sample_rate": 44100,
+            "clipping_detected": False,
+            "silence_percent": 10.0,
+            "volume_ok": True,
+        }
+        assert pipeline._compute_quality_score(quality) == 100
+
+        pipeline.quality_checker.MAX_SILENCE_PERCENT = 5
+        assert pipeline._compute_quality_score(quality) == 85
+
+
 class TestBuildAnalysisPrompt:
     """Test analysis prompt building."""
 
@@ -546,11 +566,27 @@ class TestParseAnalysisResponse:
         )
         
         result = pipeline._parse_analysis_response("Not valid JSON at all")
-        
+
         assert result["qualityScore"] == 0.5
         assert result["safetyPassed"] is True
         assert "insights" in result
 
+    def test_returns_safe_defaults_on_invalid_structure(self, mock_session_store):
+        """Test that well-formed JSON with the wrong shape returns safe defaults."""
+        pipeline = VerificationPipeline(
+            session_store=mock_session_store,
+            openrouter_api_key="test-key"
+        )
+
+        for payload in (
+            [{"qualityScore": 0.9}],
+            {"qualityScore": "0.9", "safetyPassed": True, "insights": []},
+            {"qualityScore": 0.9, "safetyPassed": "yes", "insights": []},
+        ):
+            result = pipeline._parse_analysis_response(json.dumps(payload))
+            assert result["qualityScore"] == 0.5
+            assert result["insights"][0] == "Analysis completed but response parsing failed"
+
 
 class TestTempFileHandling:
     """Test temporary file context manager."""
@@ -663,3 +699,49 @@ class TestTimeoutScenarios:
         
         # Run should complete within timeout
         await pipeline.run("session-id", str(valid_audio_file), {"title": "Test"})
+
+
+class TestStageOrdering:
+    """Test that expensive stages only run when earlier stages allow it."""
+
+    def _pipeline(self, mock_session_store, transcript, languages):
+        mock_session_store.update_stage = AsyncMock(return_value=True)
+        mock_session_store.mark_failed = AsyncMock(return_value=True)
+        mock_session_store.mark_completed = AsyncMock(return_value=True)
+
+        pipeline = VerificationPipeline(
+            session_store=mock_session_store,
+            openrouter_api_key="test-key"
+        )
+        pipeline._stage_quality_check = AsyncMock(return_value={
+            "quality": {"passed": True, "duration": 10, "sample_rate": 16000}
+        })
+        pipeline._stage_copyright_check = AsyncMock(return_value={
+            "copyright": {"detected": False}
+        })
+        pipeline._stage_transcription = AsyncMock(return_value=(transcript, languages))
+        pipeline._stage_analysis = AsyncMock(return_value={
+            "qualityScore": 0.8, "safetyPassed": True, "insights": [], "concerns": []
+        })
+        return pipeline
+
+    @pytest.mark.asyncio
+    async def test_empty_transcript_skips_analysis(self, mock_session_store):
+        """Test that AI analysis is not requested when transcription fails."""
+        pipeline = self._pipeline(mock_session_store, "", [])
+
+        await pipeline.run("session-id", "/tmp/audio.wav", {"title": "Test"})
+
+        pipeline._stage_analysis.assert_not_awaited()
+        assert mock_session_store.mark_failed.await_args[0][1]["stage_failed"] == "transcription"
+
+    @pytest.mark.asyncio
+    async def test_analysis_runs_once_with_detected_languages(self, mock_session_store):
+        """Test that AI analysis runs exactly once and receives detected languages."""
+        pipeline = self._pipeline(mock_session_store, "Hello there", ["en"])
+
+        with patch.object(pipeline, "_award_points", new=AsyncMock()):
+            await pipeline.run("session-id", "/tmp/audio.wav", {"title": "Test"})
+
+        pipeline._stage_analysis.assert_awaited_once()
+        assert pipeline._stage_analysis.await_args[0][4] == ["en"]
@@ -13,11 +13,13 @@ Six-stage pipeline:
 import json
 import logging
 import os
+import re
 import tempfile
 from contextlib import asynccontextmanager
-from typing import Any, Dict, Optional, cast, List
+from typing import Annotated, Any, Dict, Optional, cast, List
 
 from openai import OpenAI
+from pydantic import BaseModel, ConfigDict, Strict, StrictBool
 
 from audio_checker import AudioQualityChecker
 from fingerprint import CopyrightDetector
@@ -34,6 +36,195 @@ OPENROUTER_MODELS = {
     "ANALYSIS": "google/gemini-2.5-flash",  # Gemini 2.5 Flash (proven stable)
 }
 
+# Markdown code fence around a model's JSON payload, with optional "json" tag
+JSON_FENCE_PATTERN = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.DOTALL)
+
+
+# Static parts of the analysis prompts, built once at import. Only the
+# dataset-specific sections are formatted per call.
+ANALYSIS_PROMPT_INTRO = """You are an expert audio dataset quality analyst for the SONAR Protocol, a decentralized audio data marketplace. Analyze this audio dataset submission and provide a comprehensive, detailed quality assessment with transparent reasoning.
+
+"""
+
+ANALYSIS_PROMPT_INSTRUCTIONS = """
+
+## Analysis Required
+
+Provide your analysis in the following JSON format with detailed reasoning:
+
+```json
+{
+  "qualityScore": 0.85,
+  "suggestedPrice": 5.0,
+  "safetyPassed": true,
+  "overallSummary": "2-3 sentence narrative describing the audio's overall quality, clarity, and key characteristics",
+  "qualityAnalysis": {
+    "clarity": {
+      "score": 0.9,
+      "reasoning": "Explanation of clarity assessment (transcription coherence, minimal errors, etc.)"
+    },
+    "contentValue": {
+      "score": 0.8,
+      "reasoning": "Explanation of content value (usefulness for AI training, diversity, relevance, etc.)"
+    },
+    "metadataAccuracy": {
+      "score": 0.85,
+      "reasoning": "Explanation of how well content matches provided metadata"
+    },
+    "completeness": {
+      "score": 0.8,
+      "reasoning": "Explanation of completeness (no obvious truncation, full context preserved, etc.)"
+    }
+  },
+  "priceAnalysis": {
+    "basePrice": 3.0,
+    "qualityMultiplier": 1.4,
+    "rarityMultiplier": 1.0,
+    "finalPrice": 5.0,
+    "breakdown": "Step-by-step explanation of pricing calculation (e.g., 'Base 3 SUI × quality multiplier 1.4 × rarity 1.0 = 4.2, rounded to 5 SUI based on market positioning')"
+  },
+  "insights": [
+    "Key strength or characteristic 1",
+    "Key strength or characteristic 2",
+    "Key strength or characteristic 3"
+  ],
+  "concerns": [
+    "Any quality concerns (if applicable)"
+  ],
+  "recommendations": {
+    "critical": ["High-priority improvements needed"],
+    "suggested": ["Recommended improvements"],
+    "optional": ["Nice-to-have enhancements"]
+  },
+  "metadataCorrections": {
+    "languages": ["ru"],
+    "tags": ["corrected-tag1", "corrected-tag2"],
+    "domain": "corrected-domain"
+  }
+}
+```
+
+### Quality Scoring Criteria (0-1 scale):
+- **Audio Clarity** (0.3): Is the transcript coherent? Minimal transcription errors? Clear speaker articulation?
+- **Content Value** (0.3): Is the content meaningful, diverse, and useful for AI training? Does it offer unique training signal?
+- **Metadata Accuracy** (0.2): Does the content match the provided metadata? Are descriptions accurate? **CRITICAL**: Verify that the user-provided categorization accurately describes the actual audio content:
+  - Does the actual content match the claimed **Use Case**? (e.g., if labeled "podcast", is it actually podcast-style dialogue? If labeled "music", does it contain music?)
+  - Does the **Content Type** align with what you hear? (e.g., if labeled "speech/dialogue", is it really dialogue vs. monologue or music?)
+  - Does the **Domain** make sense? (e.g., if labeled "healthcare", does it discuss medical topics? If labeled "education", is it educational content?)
+  - **If metadata is incorrect**, provide corrected values in the "metadataCorrections" field. Include ONLY fields that need correction (languages, tags, domain). Use ISO 639-1 language codes (e.g., "ru" for Russian, "en" for English, "zh" for Chinese, "ar" for Arabic).
+  - Flag significant mismatches in the "concerns" array with specific details (e.g., "Audio labeled as 'podcast' but contains only instrumental music", "The listed languages 'de, ar' are incorrect; the audio content is clearly in Russian")
+- **Completeness** (0.2): Is the content complete without obvious truncation? Are complete thoughts/sentences included?
+
+**Default Quality Score**: If the audio is average/unremarkable with no notable quality issues or standout features, use 0.5 (50%) as the default baseline score.
+
+### Purchase Price Suggestion (3-10 SUI):
+Suggest a fair market price in SUI tokens (minimum: 3, maximum: 10) based on:
+- **Quality Score** (40%): Higher quality = higher price (0.5-0.7 = 1.0-1.3x, 0.7-0.85 = 1.3-1.6x, 0.85-1.0 = 1.6-2.0x)
+- **Content Uniqueness** (30%): Rare/unique content commands premium (common = 1.0x, unique = 1.2x, rare = 1.5x)
+- **Duration & Completeness** (20%): Longer, complete datasets worth more
+- **Metadata Richness** (10%): Well-documented datasets more valuable
+
+Pricing Guidelines:
+- 3-4 SUI: Basic quality, common content, limited value
+- 5-6 SUI: Good quality, useful content, practical value
+- 7-8 SUI: High quality, unique/specialized content, strong value
+- 9-10 SUI: Exceptional quality, rare/premium content, exceptional value
+
+Show your calculation: Base price × quality multiplier × rarity multiplier
+
+### Safety Screening:
+Flag as unsafe (safetyPassed: false) ONLY if content contains:
+- Sexually explicit content or pornography
+- Graphic violence, gore, or disturbing violent imagery
+- Copyrighted material (recognizable songs, music, or audio from movies/TV/radio)
+
+All other content is acceptable. Conversational datasets with profanity, political discussion, or other sensitive topics are ACCEPTABLE.
+
+### Insights:
+Provide 3-5 specific, actionable insights about:
+- Content quality and clarity assessment
+- Potential use cases (conversational AI, voice synthesis, etc.)
+- Unique characteristics or standout features
+- Market value proposition and competitive positioning
+
+**If there are no notable insights**, use an empty array: "insights": []
+
+### Concerns:
+List specific quality or content issues found. **If there are no concerns**, use an empty array: "concerns": []
+
+When flagging metadata errors, be specific (e.g., "The listed languages 'de, ar' are incorrect; the audio content is clearly in Russian").
+
+### Metadata Corrections:
+**If and only if** the user-provided metadata is incorrect, provide corrected values in the "metadataCorrections" field:
+- Include ONLY fields that need correction (languages, tags, domain)
+- Use ISO 639-1 language codes (e.g., "ru" for Russian, "en" for English, "zh" for Chinese, "ar" for Arabic, "de" for German)
+- If metadata is accurate, omit this field entirely or use an empty object: "metadataCorrections": {}
+
+### Recommendations:
+Categorize suggestions by priority:
+- **Critical**: Issues that significantly impact quality (e.g., missing segments, poor audio quality)
+- **Suggested**: Improvements that would enhance value (e.g., better metadata, additional context)
+- **Optional**: Nice-to-have enhancements (e.g., extended analysis, supplementary materials)
+
+**If there are no recommendations**, use: "recommendations": {"critical": [], "suggested": [], "optional": []}
+
+Respond ONLY with the JSON object, no additional text."""
+
+PER_FILE_PROMPT_INTRO = """You are analyzing a multi-file audio dataset. Based on the transcript and file information, provide per-file quality insights.
+
+"""
+
+PER_FILE_PROMPT_INSTRUCTIONS = """
+
+Provide your analysis in the following JSON format:
+
+```json
+{
+  "fileAnalyses": [
+    {
+      "fileIndex": 0,
+      "title": "File Title",
+      "score": 0.85,
+      "summary": "One-sentence assessment of this file's quality",
+      "strengths": ["Strength 1", "Strength 2"],
+      "concerns": ["Concern 1"],
+      "recommendations": ["Recommendation 1"]
+    }
+  ]
+}
+```
+
+For each file:
+- Estimate its relative quality based on the transcript
+- Identify file-specific strengths and concerns
+- Suggest improvements
+- Keep assessments concise
+
+Respond ONLY with the JSON object, no additional text."""
+
+
+class AnalysisResponse(BaseModel):
+    """
+    Shape of the analysis model's JSON reply.
+
+    Validated in one pass by pydantic-core while the JSON is parsed. Only the
+    required fields are typed strictly; optional fields are normalized by
+    _parse_analysis_response so a malformed extra doesn't discard the analysis.
+    """
+
+    model_config = ConfigDict(extra="ignore")
+
+    qualityScore: Annotated[float, Strict()]
+    safetyPassed: StrictBool
+    insights: List[Any]
+    suggestedPrice: Any = 3.0
+    concerns: Any = []
+    recommendations: Any = []
+    overallSummary: Any = ""
+    qualityAnalysis: Any = None
+    priceAnalysis: Any = None
+    metadataCorrections: Any = {}
+
 
 class VerificationPipeline:
     """
@@ -48,6 +239,8 @@ class VerificationPipeline:
         session_store: SessionStore,
         openrouter_api_key: str,
         acoustid_api_key: Optional[str] = None,
+        quality_checker: Optional[AudioQualityChecker] = None,
+        copyright_detector: Optional[CopyrightDetector] = None,
     ):
         """
         Initialize the verification pipeline.
@@ -56,6 +249,10 @@ class VerificationPipeline:
             session_store: Session store for session state (PostgreSQL)
             openrouter_api_key: OpenRouter API key for transcription and analysis
             acoustid_api_key: AcoustID API key for copyright detection
+            quality_checker: Shared quality checker to reuse (optional, one is
+                created if not provided)
+            copyright_detector: Shared detector to reuse (optional, one is
+                created from acoustid_api_key if not provided)
         """
         self.session_store = session_store
 
@@ -70,8 +267,8 @@ class VerificationPipeline:
         )
 
         # Initialize quality and copyright checkers
-        self.quality_checker = AudioQualityChecker()
-        self.copyright_detector = CopyrightDetector(acoustid_api_key)
+        self.quality_checker = quality_checker or AudioQualityChecker()
+        self.copyright_detector = copyright_detector or CopyrightDetector(acoustid_api_key)
 
         # Initialize points system
         self.points_calculator = PointsCalculator()
@@ -247,16 +444,7 @@ class VerificationPipeline:
                 session_object_id, audio_file_path
             )
 
-            # Stage 4: AI Analysis
-            analysis_result = await self._stage_analysis(
-                session_object_id,
-                transcript,
-                metadata,
-                quality_info,
-                detected_languages,
-            )
-
-            # Handle transcription failure
+            # Handle transcription failure before paying for AI analysis
             if not transcript:
                 logger.warning(f"[{session_object_id}] Transcription returned empty")
                 success = await self.session_store.mark_failed(
@@ -276,7 +464,8 @@ class VerificationPipeline:
                 session_object_id,
                 transcript,
                 metadata,
-                quality_result.get("quality", {}),
+                quality_info,
+                detected_languages,
             )
 
             # Stage 5: Aggregation
@@ -867,9 +1056,10 @@ Provide clean, readable transcript with these annotations. Each speaker's dialog
             transcript[:2000] + "..." if len(transcript) > 2000 else transcript
         )
 
-        return f"""You are an expert audio dataset quality analyst for the SONAR Protocol, a decentralized audio data marketplace. Analyze this audio dataset submission and provide a comprehensive, detailed quality assessment with transparent reasoning.
-
-## Dataset Metadata
+        return "".join(
+            (
+                ANALYSIS_PROMPT_INTRO,
+                f"""## Dataset Metadata
 - Title: {metadata.get("title", "Unknown")}
 - Description: {metadata.get("description", "No description")}
 - Languages: {", ".join(metadata.get("languages", []))}
@@ -884,129 +1074,10 @@ Provide clean, readable transcript with these annotations. Each speaker's dialog
 {audio_meta_str}
 
 ## Transcript Sample
-{transcript_sample}
-
-## Analysis Required
-
-Provide your analysis in the following JSON format with detailed reasoning:
-
-```json
-{{
-  "qualityScore": 0.85,
-  "suggestedPrice": 5.0,
-  "safetyPassed": true,
-  "overallSummary": "2-3 sentence narrative describing the audio's overall quality, clarity, and key characteristics",
-  "qualityAnalysis": {{
-    "clarity": {{
-      "score": 0.9,
-      "reasoning": "Explanation of clarity assessment (transcription coherence, minimal errors, etc.)"
-    }},
-    "contentValue": {{
-      "score": 0.8,
-      "reasoning": "Explanation of content value (usefulness for AI training, diversity, relevance, etc.)"
-    }},
-    "metadataAccuracy": {{
-      "score": 0.85,
-      "reasoning": "Explanation of how well content matches provided metadata"
-    }},
-    "completeness": {{
-      "score": 0.8,
-      "reasoning": "Explanation of completeness (no obvious truncation, full context preserved, etc.)"
-    }}
-  }},
-  "priceAnalysis": {{
-    "basePrice": 3.0,
-    "qualityMultiplier": 1.4,
-    "rarityMultiplier": 1.0,
-    "finalPrice": 5.0,
-    "breakdown": "Step-by-step explanation of pricing calculation (e.g., 'Base 3 SUI × quality multiplier 1.4 × rarity 1.0 = 4.2, rounded to 5 SUI based on market positioning')"
-  }},
-  "insights": [
-    "Key strength or characteristic 1",
-    "Key strength or characteristic 2",
-    "Key strength or characteristic 3"
-  ],
-  "concerns": [
-    "Any quality concerns (if applicable)"
-  ],
-  "recommendations": {{
-    "critical": ["High-priority improvements needed"],
-    "suggested": ["Recommended improvements"],
-    "optional": ["Nice-to-have enhancements"]
-  }},
-  "metadataCorrections": {{
-    "languages": ["ru"],
-    "tags": ["corrected-tag1", "corrected-tag2"],
-    "domain": "corrected-domain"
-  }}
-}}
-```
-
-### Quality Scoring Criteria (0-1 scale):
-- **Audio Clarity** (0.3): Is the transcript coherent? Minimal transcription errors? Clear speaker articulation?
-- **Content Value** (0.3): Is the content meaningful, diverse, and useful for AI training? Does it offer unique training signal?
-- **Metadata Accuracy** (0.2): Does the content match the provided metadata? Are descriptions accurate? **CRITICAL**: Verify that the user-provided categorization accurately describes the actual audio content:
-  - Does the actual content match the claimed **Use Case**? (e.g., if labeled "podcast", is it actually podcast-style dialogue? If labeled "music", does it contain music?)
-  - Does the **Content Type** align with what you hear? (e.g., if labeled "speech/dialogue", is it really dialogue vs. monologue or music?)
-  - Does the **Domain** make sense? (e.g., if labeled "healthcare", does it discuss medical topics? If labeled "education", is it educational content?)
-  - **If metadata is incorrect**, provide corrected values in the "metadataCorrections" field. Include ONLY fields that need correction (languages, tags, domain). Use ISO 639-1 language codes (e.g., "ru" for Russian, "en" for English, "zh" for Chinese, "ar" for Arabic).
-  - Flag significant mismatches in the "concerns" array with specific details (e.g., "Audio labeled as 'podcast' but contains only instrumental music", "The listed languages 'de, ar' are incorrect; the audio content is clearly in Russian")
-- **Completeness** (0.2): Is the content complete without obvious truncation? Are complete thoughts/sentences included?
-
-**Default Quality Score**: If the audio is average/unremarkable with no notable quality issues or standout features, use 0.5 (50%) as the default baseline score.
-
-### Purchase Price Suggestion (3-10 SUI):
-Suggest a fair market price in SUI tokens (minimum: 3, maximum: 10) based on:
-- **Quality Score** (40%): Higher quality = higher price (0.5-0.7 = 1.0-1.3x, 0.7-0.85 = 1.3-1.6x, 0.85-1.0 = 1.6-2.0x)
-- **Content Uniqueness** (30%): Rare/unique content commands premium (common = 1.0x, unique = 1.2x, rare = 1.5x)
-- **Duration & Completeness** (20%): Longer, complete datasets worth more
-- **Metadata Richness** (10%): Well-documented datasets more valuable
-
-Pricing Guidelines:
-- 3-4 SUI: Basic quality, common content, limited value
-- 5-6 SUI: Good quality, useful content, practical value
-- 7-8 SUI: High quality, unique/specialized content, strong value
-- 9-10 SUI: Exceptional quality, rare/premium content, exceptional value
-
-Show your calculation: Base price × quality multiplier × rarity multiplier
-
-### Safety Screening:
-Flag as unsafe (safetyPassed: false) ONLY if content contains:
-- Sexually explicit content or pornography
-- Graphic violence, gore, or disturbing violent imagery
-- Copyrighted material (recognizable songs, music, or audio from movies/TV/radio)
-
-All other content is acceptable. Conversational datasets with profanity, political discussion, or other sensitive topics are ACCEPTABLE.
-
-### Insights:
-Provide 3-5 specific, actionable insights about:
-- Content quality and clarity assessment
-- Potential use cases (conversational AI, voice synthesis, etc.)
-- Unique characteristics or standout features
-- Market value proposition and competitive positioning
-
-**If there are no notable insights**, use an empty array: "insights": []
-
-### Concerns:
-List specific quality or content issues found. **If there are no concerns**, use an empty array: "concerns": []
-
-When flagging metadata errors, be specific (e.g., "The listed languages 'de, ar' are incorrect; the audio content is clearly in Russian").
-
-### Metadata Corrections:
-**If and only if** the user-provided metadata is incorrect, provide corrected values in the "metadataCorrections" field:
-- Include ONLY fields that need correction (languages, tags, domain)
-- Use ISO 639-1 language codes (e.g., "ru" for Russian, "en" for English, "zh" for Chinese, "ar" for Arabic, "de" for German)
-- If metadata is accurate, omit this field entirely or use an empty object: "metadataCorrections": {{}}
-
-### Recommendations:
-Categorize suggestions by priority:
-- **Critical**: Issues that significantly impact quality (e.g., missing segments, poor audio quality)
-- **Suggested**: Improvements that would enhance value (e.g., better metadata, additional context)
-- **Optional**: Nice-to-have enhancements (e.g., extended analysis, supplementary materials)
-
-**If there are no recommendations**, use: "recommendations": {{"critical": [], "suggested": [], "optional": []}}
-
-Respond ONLY with the JSON object, no additional text."""
+{transcript_sample}""",
+                ANALYSIS_PROMPT_INSTRUCTIONS,
+            )
+        )
 
     def _build_per_file_analysis_prompt(
         self,
@@ -1025,48 +1096,44 @@ Respond ONLY with the JSON object, no additional text."""
         Returns:
             Prompt string requesting per-file analysis
         """
-        files_description = ""
-        for i, file_info in enumerate(per_file_data, 1):
-            files_description += f"\n{i}. {file_info.get('title', f'File {i}')}"
-            if file_info.get("description"):
-                files_description += f" - {file_info['description']}"
+        files_description = "".join(
+            f"\n{i}. {file_info.get('title', f'File {i}')}"
+            + (f" - {file_info['description']}" if file_info.get("description") else "")
+            for i, file_info in enumerate(per_file_data, 1)
+        )
 
         transcript_sample = (
             transcript[:2000] + "..." if len(transcript) > 2000 else transcript
         )
 
-        return f"""You are analyzing a multi-file audio dataset. Based on the transcript and file information, provide per-file quality insights.
-
-## Files in Dataset:{files_description}
+        return "".join(
+            (
+                PER_FILE_PROMPT_INTRO,
+                f"""## Files in Dataset:{files_description}
 
 ## Transcript Sample
-{transcript_sample}
+{transcript_sample}""",
+                PER_FILE_PROMPT_INSTRUCTIONS,
+            )
+        )
 
-Provide your analysis in the following JSON format:
+    def _extract_json_payload(self, response_text: str) -> str:
+        """
+        Pull the JSON document out of a model response.
 
-```json
-{{
-  "fileAnalyses": [
-    {{
-      "fileIndex": 0,
-      "title": "File Title",
-      "score": 0.85,
-      "summary": "One-sentence assessment of this file's quality",
-      "strengths": ["Strength 1", "Strength 2"],
-      "concerns": ["Concern 1"],
-      "recommendations": ["Recommendation 1"]
-    }}
-  ]
-}}
-```
+        Prefers a fenced code block (with or without a ``json`` tag), then the
+        outermost brace pair, then the stripped text as-is.
+        """
+        fence = JSON_FENCE_PATTERN.search(response_text)
+        if fence:
+            return fence.group(1)
 
-For each file:
-- Estimate its relative quality based on the transcript
-- Identify file-specific strengths and concerns
-- Suggest improvements
-- Keep assessments concise
+        first_brace = response_text.find("{")
+        last_brace = response_text.rfind("}")
+        if first_brace != -1 and last_brace != -1:
+            return response_text[first_brace : last_brace + 1]
 
-Respond ONLY with the JSON object, no additional text."""
+        return response_text.strip()
 
     def _parse_per_file_response(
         self, response_text: str
@@ -1077,15 +1144,7 @@ Respond ONLY with the JSON object, no additional text."""
         Returns None if parsing fails (not critical).
         """
         try:
-            # Extract JSON from markdown code blocks if present
-            json_match = response_text.find("```json")
-            if json_match != -1:
-                start = json_match + 7
-                end = response_text.find("```", start)
-                json_string = response_text[start:end].strip()
-            else:
-                json_string = response_text.strip()
-
+            json_string = self._extract_json_payload(response_text)
             parsed = json.loads(json_string)
             return parsed.get("fileAnalyses", []) if isinstance(parsed, dict) else None
 
@@ -1107,47 +1166,16 @@ Respond ONLY with the JSON object, no additional text."""
             detected_languages: Languages detected from transcript (e.g., ['ru'])
         """
         try:
-            # Extract JSON from markdown code blocks if present
-            # Try multiple extraction methods for better compatibility with Gemini 3 Pro
-            if "```json" in response_text:
-                # Method 1: Explicit ```json block
-                start = response_text.find("```json") + 7
-                end = response_text.find("```", start)
-                json_string = response_text[start:end].strip()
-            elif "```" in response_text:
-                # Method 2: Generic code block
-                start = response_text.find("```") + 3
-                end = response_text.find("```", start)
-                json_string = response_text[start:end].strip()
-                # Skip language identifier if present (e.g., "json\n")
-                if json_string.startswith("json\n"):
-                    json_string = json_string[5:]
-                elif json_string.startswith("json "):
-                    json_string = json_string[5:]
-            else:
-                # Method 3: Try to find JSON object directly
-                first_brace = response_text.find("{")
-                last_brace = response_text.rfind("}")
-                if first_brace != -1 and last_brace != -1:
-                    json_string = response_text[first_brace : last_brace + 1]
-                else:
-                    json_string = response_text.strip()
-
-            parsed = json.loads(json_string)
-
-            # Validate response structure
-            if (
-                not isinstance(parsed.get("qualityScore"), (int, float))
-                or not isinstance(parsed.get("safetyPassed"), bool)
-                or not isinstance(parsed.get("insights"), list)
-            ):
-                raise ValueError("Invalid response structure from Gemini")
+            json_string = self._extract_json_payload(response_text)
+            # Parse and validate the response structure in one pass; a
+            # ValidationError (a ValueError) falls through to the safe defaults
+            parsed = AnalysisResponse.model_validate_json(json_string)
 
             # Normalize quality score to 0-1 range
-            quality_score = max(0.0, min(1.0, float(parsed["qualityScore"])))
+            quality_score = max(0.0, min(1.0, parsed.qualityScore))
 
             # Extract and clamp suggested price to 3-10 SUI range
-            suggested_price = parsed.get("suggestedPrice", 3.0)
+            suggested_price = parsed.suggestedPrice
             try:
                 suggested_price = float(suggested_price)
                 suggested_price = max(
@@ -1157,12 +1185,12 @@ Respond ONLY with the JSON object, no additional text."""
                 suggested_price = 3.0  # Default to minimum if invalid
 
             # Extract new structured fields (gracefully handle if missing)
-            quality_analysis = parsed.get("qualityAnalysis")
-            price_analysis = parsed.get("priceAnalysis")
-            overall_summary = parsed.get("overallSummary", "")
+            quality_analysis = parsed.qualityAnalysis
+            price_analysis = parsed.priceAnalysis
+            overall_summary = parsed.overallSummary
 
             # Handle both new categorized and legacy flat recommendations
-            recommendations_raw = parsed.get("recommendations", [])
+            recommendations_raw = parsed.recommendations
             if isinstance(recommendations_raw, dict):
                 # New format: {"critical": [...], "suggested": [...], "optional": [...]}
                 recommendations = recommendations_raw
@@ -1173,7 +1201,7 @@ Respond ONLY with the JSON object, no additional text."""
                 )
 
             # Extract metadata corrections if provided by AI
-            metadata_corrections_raw = parsed.get("metadataCorrections", {})
+            metadata_corrections_raw = parsed.metadataCorrections
             metadata_corrections = {}
             if isinstance(metadata_corrections_raw, dict):
                 # Only include non-empty corrections
@@ -1189,9 +1217,9 @@ Respond ONLY with the JSON object, no additional text."""
             result = {
                 "qualityScore": quality_score,
                 "suggestedPrice": suggested_price,
-                "safetyPassed": bool(parsed["safetyPassed"]),
-                "insights": parsed.get("insights", []),
-                "concerns": parsed.get("concerns", []),
+                "safetyPassed": parsed.safetyPassed,
+                "insights": parsed.insights,
+                "concerns": parsed.concerns,
                 "recommendations": recommendations,
                 "overallSummary": overall_summary,
                 "detectedLanguages": detected_languages or [],
@@ -1346,12 +1374,14 @@ Respond ONLY with the JSON object, no additional text."""
             raise RuntimeError(
                 f"Failed to update stage '{stage_name}' for session {session_object_id[:8]}..."
             )
-        logger.info(
-            "stage_update session=%s stage=%s progress=%.2f",
-            session_object_id[:8],
-            stage_name,
-            progress,
-        )
+        # Guard so the id slice is skipped entirely when INFO is disabled
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "stage_update session=%s stage=%s progress=%.2f",
+                session_object_id[:8],
+                stage_name,
+                progress,
+            )
 
     def _compute_quality_score(self, quality: Dict[str, Any]) -> int:
         """
@@ -1367,17 +1397,16 @@ Respond ONLY with the JSON object, no additional text."""
         clipping = quality.get("clipping_detected", quality.get("clipping", False))
         silence_percent = quality.get("silence_percent", 0.0)
         volume_ok = quality.get("volume_ok", False)
+        # Read from the checker on every call so threshold changes apply
+        checker = self.quality_checker
 
-        if (
-            duration < self.quality_checker.MIN_DURATION
-            or duration > self.quality_checker.MAX_DURATION
-        ):
+        if duration < checker.MIN_DURATION or duration > checker.MAX_DURATION:
             score -= 25
-        if sample_rate < self.quality_checker.MIN_SAMPLE_RATE:
+        if sample_rate < checker.MIN_SAMPLE_RATE:
             score -= 25
         if clipping:
             score -= 20
-        if silence_percent >= self.quality_checker.MAX_SILENCE_PERCENT:
+        if silence_percent >= checker.MAX_SILENCE_PERCENT:
             score -= 15
         if not volume_ok:
             score -= 15
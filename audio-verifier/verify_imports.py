@@ -1,9 +1,14 @@
 import sys
 import importlib
+import importlib.util
 
-def check_import(module_name):
+def check_import(module_name, load=False):
+    """Check a module is importable; only execute it when load=True."""
     try:
-        importlib.import_module(module_name)
+        if load:
+            importlib.import_module(module_name)
+        elif importlib.util.find_spec(module_name) is None:
+            raise ImportError(f"No module named '{module_name}'")
         print(f"✅ {module_name} imported successfully")
         return True
     except ImportError as e:
@@ -16,7 +21,8 @@ print("Verifying imports...")
 success = True
 success &= check_import("httpx")
 success &= check_import("cryptography")
-success &= check_import("cryptography.hazmat.primitives.ciphers.aead")
+# Load the AEAD module for real to confirm the OpenSSL bindings work
+success &= check_import("cryptography.hazmat.primitives.ciphers.aead", load=True)
 success &= check_import("Crypto.Cipher")
 success &= check_import("Crypto.Util")
 
@@ -22,23 +22,23 @@ def run_command(cmd: list, description: str = "Command") -> bool:
     """
     try:
         print(f"📊 {description}...")
-        result = subprocess.run(
+        # Stream output line by line so progress shows up as it happens
+        with subprocess.Popen(
             cmd,
-            check=False,
-            capture_output=True,
-            text=True
-        )
-
-        if result.stdout:
-            print(result.stdout)
-        if result.stderr:
-            print(result.stderr, file=sys.stderr)
-
-        if result.returncode == 0:
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1
+        ) as proc:
+            for line in proc.stdout:
+                print(line, end='', flush=True)
+            returncode = proc.wait()
+
+        if returncode == 0:
             print(f"✓ {description} succeeded")
             return True
         else:
-            print(f"❌ {description} failed with exit code {result.returncode}")
+            print(f"❌ {description} failed with exit code {returncode}")
             return False
 
     except Exception as e:
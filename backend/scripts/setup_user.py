@@ -16,65 +16,56 @@ def ensure_file_exists(filepath: Path, mode: int = 0o644):
     return filepath
 
 
-def user_exists(passwd_file: Path, username: str) -> bool:
-    """Check if user already exists in passwd file."""
-    if not passwd_file.exists():
-        return False
-    with open(passwd_file, 'r') as f:
-        for line in f:
-            if line.startswith(f'{username}:'):
-                return True
-    return False
-
-
-def group_exists(group_file: Path, groupname: str) -> bool:
-    """Check if group already exists in group file."""
-    if not group_file.exists():
-        return False
-    with open(group_file, 'r') as f:
-        for line in f:
-            if line.startswith(f'{groupname}:'):
-                return True
-    return False
-
-
-def add_user_entry(passwd_file: Path, username: str, uid: int, gid: int,
-                   home_dir: str, shell: str = '/bin/sh'):
+def load_names(filepath: Path) -> set[str]:
+    """Read the entry names (first field) of a passwd/group style file."""
+    if not filepath.exists():
+        return set()
+    with open(filepath, 'r') as f:
+        return {line.split(':', 1)[0] for line in f if line.strip()}
+
+
+def add_user_entry(passwd_file: Path, passwd_names: set[str], username: str, uid: int,
+                   gid: int, home_dir: str, shell: str = '/bin/sh'):
     """Add user entry to passwd file."""
-    if user_exists(passwd_file, username):
+    if username in passwd_names:
         print(f"User {username} already exists in {passwd_file}")
         return
 
     entry = f"{username}:x:{uid}:{gid}:{username} user:{home_dir}:{shell}\n"
     with open(passwd_file, 'a') as f:
         f.write(entry)
+    passwd_names.add(username)
     print(f"Added user {username} to {passwd_file}")
 
 
-def add_group_entry(group_file: Path, groupname: str, gid: int):
+def add_group_entry(group_file: Path, group_names: set[str], groupname: str, gid: int):
     """Add group entry to group file."""
-    if group_exists(group_file, groupname):
+    if groupname in group_names:
         print(f"Group {groupname} already exists in {group_file}")
         return
 
     entry = f"{groupname}:x:{gid}:\n"
     with open(group_file, 'a') as f:
         f.write(entry)
+    group_names.add(groupname)
     print(f"Added group {groupname} to {group_file}")
 
 
-def ensure_root_user(passwd_file: Path, group_file: Path):
+def ensure_root_user(passwd_file: Path, group_file: Path,
+                     passwd_names: set[str], group_names: set[str]):
     """Ensure root user exists in passwd and group files."""
-    if not user_exists(passwd_file, 'root'):
+    if 'root' not in passwd_names:
         entry = "root:x:0:0:root:/root:/bin/sh\n"
         with open(passwd_file, 'a') as f:
             f.write(entry)
+        passwd_names.add('root')
         print("Added root user to passwd file")
 
-    if not group_exists(group_file, 'root'):
+    if 'root' not in group_names:
         entry = "root:x:0:\n"
         with open(group_file, 'a') as f:
             f.write(entry)
+        group_names.add('root')
         print("Added root group to group file")
 
 
@@ -96,8 +87,12 @@ def main():
     ensure_file_exists(group_file, 0o644)
     ensure_file_exists(gshadow_file, 0o600)
 
+    # Read existing entries once; the helpers keep the sets current
+    passwd_names = load_names(passwd_file)
+    group_names = load_names(group_file)
+
     # Ensure root user exists
-    ensure_root_user(passwd_file, group_file)
+    ensure_root_user(passwd_file, group_file, passwd_names, group_names)
 
     # Create backend user
     backend_uid = 1000
@@ -105,11 +100,11 @@ def main():
     backend_home = Path('/home/backend')
 
     # Add backend user to passwd
-    add_user_entry(passwd_file, 'backend', backend_uid, backend_gid,
+    add_user_entry(passwd_file, passwd_names, 'backend', backend_uid, backend_gid,
                    str(backend_home), '/bin/sh')
 
     # Add backend group to group file
-    add_group_entry(group_file, 'backend', backend_gid)
+    add_group_entry(group_file, group_names, 'backend', backend_gid)
 
     # Create home directory
     backend_home.mkdir(parents=True, exist_ok=True)
@@ -124,10 +119,12 @@ def main():
     def chown_recursive(path: Path, uid: int, gid: int):
         """Recursively change ownership of directory and all contents."""
         os.chown(path, uid, gid)
-        if path.is_dir():
-            for item in path.rglob('*'):
+        # fwalk hands back a dir fd per directory, so entries are chowned
+        # relative to it without building or re-resolving full paths
+        for _, dirnames, filenames, dir_fd in os.fwalk(path):
+            for name in dirnames + filenames:
                 try:
-                    os.chown(item, uid, gid)
+                    os.chown(name, uid, gid, dir_fd=dir_fd, follow_symlinks=False)
                 except OSError:
                     pass  # Skip files we can't chown
 
@@ -2,7 +2,7 @@
 set -e
 
 echo "Installing test dependencies..."
-pip3 install -q pytest pytest-asyncio pytest-cov hypothesis fakeredis httpx pydantic redis 2>/dev/null || echo "Some dependencies failed, continuing..."
+pip3 install -q pytest pytest-asyncio pytest-cov pytest-xdist hypothesis fakeredis httpx pydantic redis 2>/dev/null || echo "Some dependencies failed, continuing..."
 
 echo ""
 echo "============================================================"
@@ -12,8 +12,10 @@ echo ""
 
 export PYTHONPATH=/Users/angel/Projects/sonar/walrus-publisher/src:$PYTHONPATH
 
-# Run tests with coverage
+# Run tests with coverage, one module per worker: session fixtures (and so
+# each worker's in-memory Redis server) are per process
 python3 -m pytest tests/ -v \
+  -n auto --dist=loadfile \
   --tb=short \
   --color=yes \
   2>&1 | head -500
@@ -1,9 +1,12 @@
+import functools
 from dataclasses import dataclass
-from typing import List, cast
+from typing import List, Tuple
 from config.platform import Config
 
 
-@dataclass
+# Slotted and immutable: large plans hold one of these per chunk, and a
+# __dict__ per instance would dominate their memory
+@dataclass(frozen=True, slots=True)
 class ChunkInfo:
     index: int
     size: int
@@ -11,6 +14,39 @@ class ChunkInfo:
     offset: int
 
 
+def _wallet_count(file_size: int, max_wallets: int) -> int:
+    # 4 wallets plus one per full 256 MiB (a quarter GiB); the shift is the
+    # exact integer form of int(file_size / 1024**3 * 4)
+    return min(max_wallets, 4 + (file_size >> 28))
+
+
+def _chunk_size(file_size: int, wallet_count: int, min_chunk_size: int, max_chunk_size: int) -> int:
+    chunk_size: int = file_size // wallet_count
+    return min(max(chunk_size, min_chunk_size), max_chunk_size)
+
+
+@functools.lru_cache(maxsize=4096)
+def _plan_chunks(
+    file_size: int, min_chunk_size: int, max_chunk_size: int, max_wallets: int
+) -> Tuple[ChunkInfo, ...]:
+    # Plans are a pure function of the file size and chunking limits, so
+    # retried inits for the same size reuse the cached plan. Limits are part
+    # of the key, so a config change never serves a stale plan.
+    wallet_count = _wallet_count(file_size, max_wallets)
+    chunk_size = _chunk_size(file_size, wallet_count, min_chunk_size, max_chunk_size)
+
+    # Every chunk but the last is chunk_size; the last gets the remaining bytes
+    return tuple(
+        ChunkInfo(
+            index=chunk_index,
+            size=min(chunk_size, file_size - offset),
+            wallet_index=chunk_index % wallet_count,
+            offset=offset,
+        )
+        for chunk_index, offset in enumerate(range(0, file_size, chunk_size))
+    )
+
+
 class ChunkingOrchestrator:
     def __init__(self):
         self.min_chunk_size = Config.CHUNK_MIN_SIZE
@@ -18,56 +54,32 @@ class ChunkingOrchestrator:
         self.max_wallets = Config.MAX_WALLETS
 
     def calculate_wallet_count(self, file_size: int) -> int:
-        size_gb = file_size / (1024**3)
-        wallet_count: int = 4 + int(size_gb * 4)
-        return cast(int, min(self.max_wallets, wallet_count))
+        return _wallet_count(file_size, self.max_wallets)
 
     def calculate_chunk_size(self, file_size: int, wallet_count: int) -> int:
-        chunk_size: int = file_size // wallet_count
-        return cast(int, min(max(chunk_size, self.min_chunk_size), self.max_chunk_size))
+        return _chunk_size(file_size, wallet_count, self.min_chunk_size, self.max_chunk_size)
 
     def plan_chunks(self, file_size: int) -> List[ChunkInfo]:
-        wallet_count = self.calculate_wallet_count(file_size)
-        chunk_size = self.calculate_chunk_size(file_size, wallet_count)
-
-        chunks: List[ChunkInfo] = []
-        offset = 0
-        chunk_index = 0
-
-        while offset < file_size:
-            # Last chunk gets remaining bytes
-            remaining = file_size - offset
-            current_chunk_size = min(chunk_size, remaining)
-
-            chunk = ChunkInfo(
-                index=chunk_index,
-                size=current_chunk_size,
-                wallet_index=chunk_index % wallet_count,
-                offset=offset,
-            )
-            chunks.append(chunk)
-
-            offset += current_chunk_size
-            chunk_index += 1
-
-        return chunks
+        plan = _plan_chunks(file_size, self.min_chunk_size, self.max_chunk_size, self.max_wallets)
+        # ChunkInfo is frozen, so only the list needs copying for the caller
+        return list(plan)
 
     def validate_chunks(self, file_size: int, chunks: List[ChunkInfo]) -> bool:
         if not chunks:
             return False
 
-        total_size = sum(chunk.size for chunk in chunks)
-        if total_size != file_size:
-            return False
-
+        # Single pass: each chunk must start where the previous one ended
+        expected_offset = 0
+        last_index = len(chunks) - 1
         for i, chunk in enumerate(chunks):
             if chunk.index != i:
                 return False
-            if chunk.offset != sum(c.size for c in chunks[:i]):
+            if chunk.offset != expected_offset:
                 return False
-            if chunk.size < self.min_chunk_size and i < len(chunks) - 1:
+            if chunk.size < self.min_chunk_size and i < last_index:
                 return False
             if chunk.size > self.max_chunk_size:
                 return False
+            expected_offset += chunk.size
 
-        return True
+        return expected_offset == file_size
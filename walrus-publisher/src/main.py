@@ -1,10 +1,12 @@
 import time
 import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import AsyncGenerator, Optional
+from typing import AsyncGenerator, AsyncIterator, Optional
 
 from fastapi import FastAPI, HTTPException, UploadFile, File, Request, Depends
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
 from fastapi.security import HTTPBearer
 from starlette.authentication import AuthCredentials
 import uvicorn
@@ -36,6 +38,7 @@ from transaction_builder import TransactionBuilder
 
 orchestrator: Optional[UploadOrchestrator] = None
 transaction_builder: Optional[TransactionBuilder] = None
+uploader: Optional[WalrusUploader] = None
 start_time: float = 0.0
 
 MAX_FILE_SIZE = 13 * (1024**3)
@@ -54,16 +57,8 @@ async def verify_api_key(credentials: Optional[HTTPAuthCredentials] = Depends(se
     return credentials.credentials
 
 
-app = FastAPI(
-    title="Walrus Publisher",
-    version=Config.VERSION,
-    description="High-performance Walrus blob publisher with sub-wallet orchestration",
-)
-
-
-@app.on_event("startup")
 async def startup():
-    global orchestrator, transaction_builder, start_time
+    global orchestrator, transaction_builder, uploader, start_time
 
     start_time = time.time()
 
@@ -71,6 +66,9 @@ async def startup():
         orchestrator = UploadOrchestrator(Config.REDIS_URL)
         await orchestrator.connect()
 
+        uploader = WalrusUploader()
+        await uploader.connect()
+
         transaction_builder = TransactionBuilder(
             Config.WALRUS_PACKAGE_ID,
             Config.WALRUS_SYSTEM_OBJECT,
@@ -85,19 +83,44 @@ async def startup():
         raise
 
 
-@app.on_event("shutdown")
 async def shutdown():
-    global orchestrator
+    global orchestrator, uploader
 
     if orchestrator:
         await orchestrator.disconnect()
+    if uploader:
+        await uploader.disconnect()
     print("✓ Service shutdown complete")
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    await startup()
+    try:
+        yield
+    finally:
+        await shutdown()
+
+
+app = FastAPI(
+    title="Walrus Publisher",
+    version=Config.VERSION,
+    description="High-performance Walrus blob publisher with sub-wallet orchestration",
+    lifespan=lifespan,
+)
+
+
+def _model_response(model: BaseModel) -> Response:
+    # The model is already validated; serializing it with pydantic-core skips
+    # FastAPI's revalidation and jsonable_encoder pass over large chunk and
+    # transaction lists
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     uptime = time.time() - start_time
-    active_sessions = len(orchestrator.sessions)
+    active_sessions = orchestrator.active_session_count if orchestrator else 0
 
     return HealthResponse(
         status="ok",
@@ -122,11 +145,13 @@ async def init_upload(request: UploadInitRequest, _: str = Depends(verify_api_ke
         assert orchestrator is not None
         session_id, chunk_plans = await orchestrator.create_upload_session(request.file_size)
 
-        return UploadInitResponse(
-            session_id=session_id,
-            chunk_count=len(chunk_plans),
-            wallet_count=len(set(plan.wallet_address for plan in chunk_plans)),
-            chunks=chunk_plans,
+        return _model_response(
+            UploadInitResponse(
+                session_id=session_id,
+                chunk_count=len(chunk_plans),
+                wallet_count=len(set(plan.wallet_address for plan in chunk_plans)),
+                chunks=chunk_plans,
+            )
         )
 
     except HTTPException:
@@ -137,6 +162,16 @@ async def init_upload(request: UploadInitRequest, _: str = Depends(verify_api_ke
         raise HTTPException(500, f"Upload initialization failed: {str(e)}")
 
 
+UPLOAD_STREAM_BLOCK_SIZE = 1024 * 1024
+
+
+def _spooled_size(file: UploadFile) -> int:
+    file.file.seek(0, 2)
+    size = file.file.tell()
+    file.file.seek(0)
+    return size
+
+
 @app.post("/upload/{session_id}/chunk/{chunk_index}", response_model=ChunkUploadResponse)
 async def upload_chunk(
     session_id: str,
@@ -144,24 +179,32 @@ async def upload_chunk(
     file: UploadFile = File(...),
     _: str = Depends(verify_api_key),
 ):
+    # Connected by the lifespan handler; absent when the app runs without it
+    if uploader is None:
+        raise HTTPException(503, "Walrus uploader not initialized")
+
     try:
         assert orchestrator is not None
         session = await orchestrator.get_session(session_id)
         if not session:
             raise HTTPException(404, f"Session {session_id} not found")
 
-        chunk_data = await file.read()
-        chunk_size = len(chunk_data)
+        # Starlette has already spooled the part to disk; stream it to Walrus
+        # in blocks rather than reading the whole chunk into memory
+        chunk_size = file.size if file.size is not None else _spooled_size(file)
 
-        async with WalrusUploader() as uploader:
-            blob_id = await uploader.upload_chunk(chunk_data, chunk_index)
-            await orchestrator.record_chunk_upload(session_id, chunk_index, blob_id)
+        async def read_blocks() -> AsyncGenerator[bytes, None]:
+            while block := await file.read(UPLOAD_STREAM_BLOCK_SIZE):
+                yield block
 
-            return ChunkUploadResponse(
-                blob_id=blob_id,
-                chunk_index=chunk_index,
-                size_bytes=chunk_size,
-            )
+        blob_id = await uploader.upload_chunk(read_blocks(), chunk_index, content_length=chunk_size)
+        await orchestrator.record_chunk_upload(session_id, chunk_index, blob_id)
+
+        return ChunkUploadResponse(
+            blob_id=blob_id,
+            chunk_index=chunk_index,
+            size_bytes=chunk_size,
+        )
 
     except HTTPException:
         raise
@@ -185,30 +228,37 @@ async def get_transactions(session_id: str, _: str = Depends(verify_api_key)):
                 f"Expected {len(session.chunks)}, got {session.chunks_uploaded}",
             )
 
-        transactions = []
-        for chunk_index, blob_id in session.blob_ids.items():
-            wallet = await orchestrator.get_wallet_for_chunk(session_id, chunk_index)
-            if not wallet:
-                raise HTTPException(500, f"Wallet not found for chunk {chunk_index}")
+        wallets = await orchestrator.get_wallets_for_chunks(session_id, list(session.blob_ids))
+        missing = next((i for i in session.blob_ids if i not in wallets), None)
+        if missing is not None:
+            raise HTTPException(500, f"Wallet not found for chunk {missing}")
 
-            tx_bytes = transaction_builder.build_register_blob_transaction(
-                blob_id,
-                wallet.address,
+        registrations = [
+            (blob_id, wallets[chunk_index].address)
+            for chunk_index, blob_id in session.blob_ids.items()
+        ]
+        # Sessions have at most MAX_WALLETS chunks and each build is a small
+        # encode, so the batch is cheaper inline than an executor hand-off
+        tx_bytes = transaction_builder.build_register_blob_transactions(registrations)
+
+        transactions = [
+            UnsignedTransaction(
+                tx_bytes=tx,
+                sub_wallet_address=sub_wallet_address,
+                blob_id=blob_id,
+                chunk_index=chunk_index,
             )
-
-            transactions.append(
-                UnsignedTransaction(
-                    tx_bytes=tx_bytes,
-                    sub_wallet_address=wallet.address,
-                    blob_id=blob_id,
-                    chunk_index=chunk_index,
-                )
+            for chunk_index, (blob_id, sub_wallet_address), tx in zip(
+                session.blob_ids, registrations, tx_bytes
             )
+        ]
 
-        return TransactionsResponse(
-            session_id=session_id,
-            transactions=transactions,
-            sponsor_address="0x0",  # Will be set by browser wallet
+        return _model_response(
+            TransactionsResponse(
+                session_id=session_id,
+                transactions=transactions,
+                sponsor_address="0x0",  # Will be set by browser wallet
+            )
         )
 
     except HTTPException:
@@ -228,8 +278,9 @@ async def finalize_upload(session_id: str, request: FinalizeRequest, _: str = De
         if not request.signed_transactions:
             raise HTTPException(400, "No transactions to submit")
 
-        for tx in request.signed_transactions:
-            await orchestrator.record_transaction_submitted(session_id)
+        await orchestrator.bump_transaction_counters(
+            session_id, submitted=len(request.signed_transactions)
+        )
 
         transaction_digests = [
             tx.digest or f"0x{i:064x}" for i, tx in enumerate(request.signed_transactions)
@@ -247,6 +298,13 @@ async def finalize_upload(session_id: str, request: FinalizeRequest, _: str = De
         raise HTTPException(500, f"Transaction finalization failed: {str(e)}")
 
 
+STATUS_HEARTBEAT_SECONDS = 30
+# Fixed SSE events, encoded once as valid JSON
+SESSION_NOT_FOUND_EVENT = 'data: {"error": "Session not found"}\n\n'
+STATUS_TIMEOUT_EVENT = 'data: {"error": "Timeout waiting for upload completion"}\n\n'
+HEARTBEAT_EVENT = ": heartbeat\n\n"
+
+
 @app.get("/upload/{session_id}/status")
 async def get_upload_status(session_id: str):
     import json
@@ -254,30 +312,73 @@ async def get_upload_status(session_id: str):
     async def event_generator() -> AsyncGenerator[str, None]:
         start_time = time.time()
         timeout_seconds = 3600
+        pubsub = None
 
         try:
             assert orchestrator is not None
-            while True:
-                if time.time() - start_time > timeout_seconds:
-                    yield f"data: {{'error': 'Timeout waiting for upload completion'}}\n\n"
-                    break
-
-                status = await orchestrator.get_upload_status(session_id)
-                if not status:
-                    yield f"data: {{'error': 'Session not found'}}\n\n"
+            # Subscribe before reading the current status so no update
+            # published in between is missed
+            if orchestrator.redis:
+                pubsub = orchestrator.redis.pubsub()
+                await pubsub.subscribe(orchestrator.status_channel(session_id))
+
+            status = await orchestrator.get_upload_status(session_id)
+            if not status:
+                yield SESSION_NOT_FOUND_EVENT
+                return
+
+            yield f"data: {status.model_dump_json()}\n\n"
+            current_status = status.status
+            last_sent = time.time()
+
+            while current_status not in ("completed", "failed"):
+                remaining = timeout_seconds - (time.time() - start_time)
+                if remaining <= 0:
+                    yield STATUS_TIMEOUT_EVENT
                     break
 
-                yield f"data: {json.dumps(status.dict())}\n\n"
-
-                if status.status in ("completed", "failed"):
-                    break
-
-                await asyncio.sleep(1)
+                if pubsub is None:
+                    # No Redis: fall back to polling the in-memory session
+                    await asyncio.sleep(1)
+                    status = await orchestrator.get_upload_status(session_id)
+                    if not status:
+                        yield SESSION_NOT_FOUND_EVENT
+                        break
+                    yield f"data: {status.model_dump_json()}\n\n"
+                    current_status = status.status
+                    continue
+
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=min(STATUS_HEARTBEAT_SECONDS, remaining),
+                )
+                if message is None:
+                    # None also covers skipped subscribe confirmations, so
+                    # only send the keep-alive once the stream is actually idle
+                    if time.time() - last_sent >= STATUS_HEARTBEAT_SECONDS:
+                        # An expired or cleaned-up session publishes nothing
+                        # more; end the stream as the polling fallback does
+                        if await orchestrator.get_session(session_id) is None:
+                            yield SESSION_NOT_FOUND_EVENT
+                            break
+                        # SSE comment line keeps proxies from closing the stream
+                        yield HEARTBEAT_EVENT
+                        last_sent = time.time()
+                    continue
+
+                data = message["data"].decode()
+                yield f"data: {data}\n\n"
+                last_sent = time.time()
+                current_status = json.loads(data).get("status")
 
         except asyncio.CancelledError:
             pass
         except Exception as e:
-            yield f"data: {{'error': '{str(e)}'}}\n\n"
+            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+        finally:
+            if pubsub is not None:
+                await pubsub.unsubscribe()
+                await pubsub.aclose()
 
     return StreamingResponse(
         event_generator(),
@@ -285,25 +386,33 @@ async def get_upload_status(session_id: str):
     )
 
 
+# Prometheus text exposition; the version line is fixed for the process, so
+# it is rendered once and only the two gauge values are formatted per scrape
+METRICS_TEMPLATE = (
+    "# HELP walrus_uploader_uptime_seconds Uptime in seconds\n"
+    "# TYPE walrus_uploader_uptime_seconds gauge\n"
+    "walrus_uploader_uptime_seconds %f\n"
+    "\n"
+    "# HELP walrus_uploader_active_sessions Active upload sessions\n"
+    "# TYPE walrus_uploader_active_sessions gauge\n"
+    "walrus_uploader_active_sessions %d\n"
+    "\n"
+    "# HELP walrus_uploader_version Service version\n"
+    "# TYPE walrus_uploader_version gauge\n"
+    + f'walrus_uploader_version{{version="{Config.VERSION}"}} 1\n'.replace("%", "%%")
+)
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
 @app.get("/metrics")
 async def get_metrics():
     uptime = time.time() - start_time
-    active_sessions = len(orchestrator.sessions)
-
-    metrics = f"""# HELP walrus_uploader_uptime_seconds Uptime in seconds
-# TYPE walrus_uploader_uptime_seconds gauge
-walrus_uploader_uptime_seconds {uptime}
+    active_sessions = orchestrator.active_session_count if orchestrator else 0
 
-# HELP walrus_uploader_active_sessions Active upload sessions
-# TYPE walrus_uploader_active_sessions gauge
-walrus_uploader_active_sessions {active_sessions}
-
-# HELP walrus_uploader_version Service version
-# TYPE walrus_uploader_version gauge
-walrus_uploader_version{{version="{Config.VERSION}"}} 1
-"""
-
-    return metrics
+    return Response(
+        content=METRICS_TEMPLATE % (uptime, active_sessions),
+        media_type=METRICS_CONTENT_TYPE,
+    )
 
 
 if __name__ == "__main__":
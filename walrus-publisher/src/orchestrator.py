@@ -1,14 +1,35 @@
+import asyncio
+import contextlib
+import time
 import uuid
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List
+from typing import Optional, Dict, Iterable, List, Tuple, Union
 import redis.asyncio as redis
-import json
 
 from models import UploadStatus, ChunkPlan
 from chunking import ChunkingOrchestrator, ChunkInfo
 from wallet_manager import WalletManager, WalletInfo
+from uploader import WalrusUploader, FileRange
 from config.platform import Config
 
+# Redis caps a command at 1024*1024 arguments, i.e. ~524k field/value pairs
+# per HSET; larger chunk mappings are split well below that
+MAX_HSET_FIELDS = 100_000
+
+# Unknown session ids are remembered briefly so status polling for a stale or
+# mistyped id doesn't hit Redis on every request
+MISSING_SESSION_TTL = 5.0  # seconds
+MISSING_SESSION_MAX_ENTRIES = 10_000
+
+UPLOAD_CONCURRENCY = 5
+UPLOAD_MAX_ATTEMPTS = 3
+UPLOAD_RETRY_BASE_DELAY = 0.5  # seconds, doubled per attempt
+UPLOAD_RETRY_MAX_DELAY = 10.0
+# upload_all records finished chunks in batches: a batch is flushed once it
+# holds this many uploads or has waited this long, whichever comes first
+UPLOAD_RECORD_BATCH_SIZE = 100
+UPLOAD_RECORD_FLUSH_INTERVAL = 0.05  # seconds
+
 
 class UploadSession:
     """Represents an active upload session."""
@@ -21,8 +42,12 @@ class UploadSession:
         wallets: List[WalletInfo],
     ):
         self.session_id = session_id
+        # Redis keys, built once instead of on every progress update
+        self.redis_key = f"session:{session_id}"
+        self.chunks_key = f"{self.redis_key}:chunks"
         self.file_size = file_size
-        self.chunks = chunks
+        self.chunks = chunks  # ordered, for iteration
+        self.chunks_by_index: Dict[int, ChunkInfo] = {c.index: c for c in chunks}
         self.wallets = wallets
         self.blob_ids: Dict[int, str] = {}  # chunk_index -> blob_id
         self.chunks_uploaded = 0
@@ -30,8 +55,23 @@ class UploadSession:
         self.transactions_submitted = 0
         self.transactions_confirmed = 0
         self.created_at = datetime.utcnow()
+        # Monotonic anchor for created_at; updates only bump a cheap counter
+        # and the wall-clock updated_at is derived when a status is built
+        self._created_ns = time.monotonic_ns()
+        self.updated_at_ns = self._created_ns
         self.error: Optional[str] = None
 
+    def touch(self):
+        """Mark the session as updated now."""
+        self.updated_at_ns = time.monotonic_ns()
+
+    @property
+    def updated_at(self) -> datetime:
+        """Wall-clock time of the last update."""
+        return self.created_at + timedelta(
+            microseconds=(self.updated_at_ns - self._created_ns) // 1000
+        )
+
     def to_status(self) -> UploadStatus:
         """Convert to UploadStatus model."""
         return UploadStatus(
@@ -45,7 +85,7 @@ class UploadSession:
             transactions_confirmed=self.transactions_confirmed,
             error=self.error,
             created_at=self.created_at,
-            updated_at=datetime.utcnow(),
+            updated_at=self.updated_at,
         )
 
 
@@ -58,10 +98,16 @@ class UploadOrchestrator:
         self.chunker = ChunkingOrchestrator()
         self.wallet_manager = WalletManager(redis_url)
         self.sessions: Dict[str, UploadSession] = {}
+        self._missing_sessions: Dict[str, float] = {}  # session_id -> cached at
+
+    @property
+    def active_session_count(self) -> int:
+        """Number of sessions held by this instance (O(1), no Redis round-trip)."""
+        return len(self.sessions)
 
     async def connect(self):
         """Connect to Redis."""
-        self.redis = await redis.from_url(self.redis_url, decode_responses=True)
+        self.redis = await redis.from_url(self.redis_url)
         await self.wallet_manager.connect()
 
     async def disconnect(self):
@@ -75,7 +121,7 @@ class UploadOrchestrator:
         Create a new upload session.
         Returns (session_id, chunk_plans).
         """
-        session_id = str(uuid.uuid4())
+        session_id = uuid.uuid4().hex  # no dashes: shorter Redis keys
         chunks = self.chunker.plan_chunks(file_size)
 
         # Validate chunks
@@ -88,6 +134,7 @@ class UploadOrchestrator:
         # Create session
         session = UploadSession(session_id, file_size, chunks, wallets)
         self.sessions[session_id] = session
+        self._missing_sessions.pop(session_id, None)
 
         # Store in Redis
         session_data = {
@@ -96,13 +143,17 @@ class UploadOrchestrator:
             "wallet_count": wallet_count,
             "chunk_count": len(chunks),
             "created_at": datetime.utcnow().isoformat(),
+            "chunks_uploaded": 0,
+            "bytes_uploaded": 0,
+            "transactions_submitted": 0,
+            "transactions_confirmed": 0,
         }
         if self.redis:
-            await self.redis.setex(
-                f"session:{session_id}",
-                Config.SESSION_TTL,
-                json.dumps(session_data),
-            )
+            # A hash lets progress counters be bumped in place with HINCRBY
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.hset(session.redis_key, mapping=session_data)
+                pipe.expire(session.redis_key, Config.SESSION_TTL)
+                await pipe.execute()
 
         # Create chunk plans
         chunk_plans = [
@@ -119,51 +170,189 @@ class UploadOrchestrator:
     async def get_session(self, session_id: str) -> Optional[UploadSession]:
         """Retrieve an upload session."""
         # Try memory cache first
-        if session_id in self.sessions:
-            return self.sessions[session_id]
+        session = self.sessions.get(session_id)
+        if session is not None:
+            return session
+
+        now = time.monotonic()
+        missed_at = self._missing_sessions.get(session_id)
+        if missed_at is not None and now - missed_at < MISSING_SESSION_TTL:
+            return None
 
         # Try Redis
         if self.redis:
-            session_data = await self.redis.get(f"session:{session_id}")
-            if session_data:
+            if await self.redis.exists(f"session:{session_id}"):
                 # Reconstruct from Redis (simplified - in production, store full state)
                 return None  # Would need to rebuild from stored data
 
+        self._missing_sessions[session_id] = now
+        if len(self._missing_sessions) > MISSING_SESSION_MAX_ENTRIES:
+            # Dicts keep insertion order, so the first key is the oldest entry
+            self._missing_sessions.pop(next(iter(self._missing_sessions)))
         return None
 
     async def record_chunk_upload(self, session_id: str, chunk_index: int, blob_id: str):
         """Record that a chunk was successfully uploaded."""
+        await self.record_chunk_uploads_batch(session_id, [(chunk_index, blob_id)])
+
+    async def record_chunk_uploads_batch(
+        self, session_id: str, uploads: List[Tuple[int, str]]
+    ):
+        """Record several completed chunk uploads with one Redis round-trip."""
         session = await self.get_session(session_id)
         if not session:
             raise ValueError(f"Session {session_id} not found")
 
-        chunk = next((c for c in session.chunks if c.index == chunk_index), None)
-        if not chunk:
-            raise ValueError(f"Chunk {chunk_index} not found in session")
+        # Validate the whole batch before applying any of it
+        batch_chunks = []
+        for chunk_index, _ in uploads:
+            chunk = session.chunks_by_index.get(chunk_index)
+            if not chunk:
+                raise ValueError(f"Chunk {chunk_index} not found in session")
+            batch_chunks.append(chunk)
 
-        session.blob_ids[chunk_index] = blob_id
-        session.chunks_uploaded += 1
-        session.bytes_uploaded += chunk.size
+        batch_bytes = sum(chunk.size for chunk in batch_chunks)
+        for chunk_index, blob_id in uploads:
+            session.blob_ids[chunk_index] = blob_id
+        session.chunks_uploaded += len(uploads)
+        session.bytes_uploaded += batch_bytes
+        session.touch()
 
         # Update Redis
-        if self.redis:
-            await self.redis.hset(
-                f"session:{session_id}:chunks",
-                str(chunk_index),
-                blob_id,
-            )
+        if self.redis and uploads:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                # Cap fields per HSET to stay well inside Redis' argument limit
+                for start in range(0, len(uploads), MAX_HSET_FIELDS):
+                    pipe.hset(
+                        session.chunks_key,
+                        mapping={
+                            str(chunk_index): blob_id
+                            for chunk_index, blob_id in uploads[start:start + MAX_HSET_FIELDS]
+                        },
+                    )
+                pipe.hincrby(session.redis_key, "chunks_uploaded", len(uploads))
+                pipe.hincrby(session.redis_key, "bytes_uploaded", batch_bytes)
+                await pipe.execute()
+        await self.publish_status(session)
+
+    async def upload_all(
+        self,
+        session_id: str,
+        chunks: Iterable[Tuple[int, Union[bytes, FileRange]]],
+        uploader: WalrusUploader,
+        concurrency: int = UPLOAD_CONCURRENCY,
+    ) -> bool:
+        """
+        Upload a session's chunks through a bounded pool of workers.
+
+        Transport failures (RuntimeError) are re-queued with capped exponential
+        backoff; any other error, or a chunk still failing after
+        UPLOAD_MAX_ATTEMPTS, marks the session errored and cancels the
+        remaining uploads. Returns True if every chunk landed.
+        """
+        session = await self.get_session(session_id)
+        if not session:
+            raise ValueError(f"Session {session_id} not found")
+
+        # Sources must be re-readable for retries, so no one-shot iterators here
+        queue: asyncio.Queue[Tuple[int, Union[bytes, FileRange], int]] = asyncio.Queue()
+        for chunk_index, chunk_data in chunks:
+            queue.put_nowait((chunk_index, chunk_data, 1))
+
+        worker_count = max(1, min(concurrency, queue.qsize()))
+        active_workers = worker_count
+        workers_done = asyncio.Event()
+        # Finished uploads wait here and go to Redis one pipeline per flush
+        # rather than one round-trip per chunk
+        pending: List[Tuple[int, str]] = []
+
+        async def flush():
+            nonlocal pending
+            if pending:
+                uploads, pending = pending, []
+                await self.record_chunk_uploads_batch(session_id, uploads)
+
+        async def flush_periodically():
+            while not workers_done.is_set():
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(workers_done.wait(), UPLOAD_RECORD_FLUSH_INTERVAL)
+                await flush()
+
+        async def worker():
+            nonlocal active_workers
+            try:
+                while True:
+                    try:
+                        chunk_index, chunk_data, attempt = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    try:
+                        blob_id = await uploader.upload_chunk(chunk_data, chunk_index)
+                    except RuntimeError:
+                        # upload_chunk surfaces httpx errors as RuntimeError; its
+                        # ValueErrors (no blob_id, truncated range) aren't retried
+                        if attempt >= UPLOAD_MAX_ATTEMPTS:
+                            raise
+                        await asyncio.sleep(
+                            min(UPLOAD_RETRY_BASE_DELAY * 2 ** (attempt - 1), UPLOAD_RETRY_MAX_DELAY)
+                        )
+                        queue.put_nowait((chunk_index, chunk_data, attempt + 1))
+                    else:
+                        pending.append((chunk_index, blob_id))
+                        if len(pending) >= UPLOAD_RECORD_BATCH_SIZE:
+                            await flush()
+            finally:
+                active_workers -= 1
+                if not active_workers:
+                    workers_done.set()
+
+        # The first task to fail cancels the rest via the task group
+        try:
+            try:
+                async with asyncio.TaskGroup() as tasks:
+                    for _ in range(worker_count):
+                        tasks.create_task(worker())
+                    tasks.create_task(flush_periodically())
+            finally:
+                # Record the chunks that landed before a failure stopped the pool
+                await flush()
+        except* Exception as failures:
+            session.error = str(failures.exceptions[0])
+            session.touch()
+
+        if session.error is not None:
+            if self.redis:
+                await self.redis.hset(session.redis_key, "error", session.error)
+            await self.publish_status(session)
+            return False
+        return True
 
     async def record_transaction_submitted(self, session_id: str):
         """Record that a transaction was submitted."""
-        session = await self.get_session(session_id)
-        if session:
-            session.transactions_submitted += 1
+        await self.bump_transaction_counters(session_id, submitted=1)
 
     async def record_transaction_confirmed(self, session_id: str):
         """Record that a transaction was confirmed on-chain."""
+        await self.bump_transaction_counters(session_id, confirmed=1)
+
+    async def bump_transaction_counters(
+        self, session_id: str, submitted: int = 0, confirmed: int = 0
+    ):
+        """Add to a session's transaction counters with one Redis round-trip."""
         session = await self.get_session(session_id)
-        if session:
-            session.transactions_confirmed += 1
+        if not session or not (submitted or confirmed):
+            return
+        session.transactions_submitted += submitted
+        session.transactions_confirmed += confirmed
+        session.touch()
+        if self.redis:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                if submitted:
+                    pipe.hincrby(session.redis_key, "transactions_submitted", submitted)
+                if confirmed:
+                    pipe.hincrby(session.redis_key, "transactions_confirmed", confirmed)
+                await pipe.execute()
+        await self.publish_status(session)
 
     async def get_upload_status(self, session_id: str) -> Optional[UploadStatus]:
         """Get current upload status."""
@@ -172,11 +361,28 @@ class UploadOrchestrator:
             return None
         return session.to_status()
 
+    @staticmethod
+    def status_channel(session_id: str) -> str:
+        """Pub/sub channel that carries a session's status updates."""
+        return f"session:{session_id}:events"
+
+    async def publish_status(self, session: UploadSession):
+        """Push a session's current status to status stream subscribers."""
+        if self.redis:
+            await self.redis.publish(
+                self.status_channel(session.session_id),
+                session.to_status().model_dump_json(),
+            )
+
     async def cleanup_session(self, session_id: str):
         """Clean up a completed or failed session."""
         session = self.sessions.pop(session_id, None)
         if session:
-            await self.wallet_manager.cleanup_session(session_id, len(session.wallets))
+            await self.wallet_manager.cleanup_session(
+                session_id,
+                len(session.wallets),
+                session_keys=(session.redis_key, session.chunks_key),
+            )
 
     async def get_wallet_for_chunk(
         self, session_id: str, chunk_index: int
@@ -186,8 +392,22 @@ class UploadOrchestrator:
         if not session:
             return None
 
-        chunk = next((c for c in session.chunks if c.index == chunk_index), None)
+        chunk = session.chunks_by_index.get(chunk_index)
         if not chunk:
             return None
 
         return session.wallets[chunk.wallet_index]
+
+    async def get_wallets_for_chunks(
+        self, session_id: str, chunk_indices: List[int]
+    ) -> Dict[int, WalletInfo]:
+        """Get the wallets assigned to several chunks with one session lookup."""
+        session = await self.get_session(session_id)
+        if not session:
+            return {}
+
+        return {
+            chunk_index: session.wallets[session.chunks_by_index[chunk_index].wallet_index]
+            for chunk_index in chunk_indices
+            if chunk_index in session.chunks_by_index
+        }
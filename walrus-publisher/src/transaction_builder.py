@@ -1,5 +1,6 @@
-from typing import Optional
-import base64
+from typing import Iterable, List, Optional, Tuple
+from binascii import b2a_base64
+import json
 from config.platform import Config
 
 try:
@@ -24,6 +25,9 @@ class TransactionBuilder:
         self.walrus_package_id = walrus_package_id.strip()
         self.walrus_system_object = walrus_system_object.strip()
 
+        # Per-session constant, built once rather than once per chunk
+        self._register_blob_target = f"{self.walrus_package_id}::storage::register_blob"
+
     def build_register_blob_transaction(
         self,
         blob_id: str,
@@ -31,20 +35,19 @@ class TransactionBuilder:
         epochs: int = 26,
     ) -> str:
         if not HAS_PYSUI or not SuiTransactionBuilder:
-            import json
-            tx_data = {
+            tx_data = json.dumps({
                 "package": self.walrus_package_id,
                 "system_object": self.walrus_system_object,
                 "blob_id": blob_id,
                 "wallet": sub_wallet_address,
                 "epochs": epochs,
-            }
-            return base64.b64encode(json.dumps(tx_data).encode()).decode("utf-8")
+            })
+            return b2a_base64(tx_data.encode(), newline=False).decode("ascii")
 
         builder = SuiTransactionBuilder()
 
         builder.move_call(
-            target=f"{self.walrus_package_id}::storage::register_blob",
+            target=self._register_blob_target,
             arguments=[
                 builder.pure(self.walrus_system_object),
                 builder.pure(blob_id),
@@ -56,4 +59,15 @@ class TransactionBuilder:
         builder.set_sender(SuiAddress.from_hex_string(sub_wallet_address))
 
         tx_bytes = builder.build()
-        return base64.b64encode(tx_bytes).decode("utf-8")
+        return b2a_base64(tx_bytes, newline=False).decode("ascii")
+
+    def build_register_blob_transactions(
+        self,
+        registrations: Iterable[Tuple[str, str]],
+        epochs: int = 26,
+    ) -> List[str]:
+        """Build register_blob transactions for (blob_id, sub_wallet_address) pairs."""
+        return [
+            self.build_register_blob_transaction(blob_id, sub_wallet_address, epochs)
+            for blob_id, sub_wallet_address in registrations
+        ]
@@ -1,38 +1,148 @@
 import httpx
 import asyncio
-from typing import Optional, Dict, Any
+import os
+from pathlib import Path
+from typing import Optional, Dict, Any, AsyncIterable, AsyncIterator, Tuple, Union
 from config.platform import Config
 
+try:
+    import h2  # noqa: F401  (enables httpx's HTTP/2 support)
+    HAS_HTTP2 = True
+except ImportError:
+    HAS_HTTP2 = False
+
+# (path, offset, length) of a chunk that already sits in a file on disk
+FileRange = Tuple[Union[str, Path], int, int]
+
+FILE_STREAM_BLOCK_SIZE = 1024 * 1024  # 1MB
+# Read buffers shared by all in-flight file-range uploads; once every one is
+# in use, further streams wait instead of allocating more
+FILE_STREAM_BUFFER_COUNT = 16
+
+
+class BufferPool:
+    """Fixed number of reusable read buffers, created on first use."""
+
+    def __init__(self, count: int, size: int):
+        self.count = count
+        self.size = size
+        self._created = 0
+        self._free: asyncio.Queue[bytearray] = asyncio.Queue()
+
+    async def acquire(self) -> bytearray:
+        if self._free.empty() and self._created < self.count:
+            self._created += 1
+            return bytearray(self.size)
+        return await self._free.get()
+
+    def release(self, buffer: bytearray):
+        self._free.put_nowait(buffer)
+
+
+async def _stream_file_range(
+    path: Union[str, Path], offset: int, length: int, pool: BufferPool
+) -> AsyncIterator[memoryview]:
+    """Yield a byte range of a file block by block, reading off the event loop.
+
+    One pooled buffer is refilled for every block: httpx has written a block
+    out before it asks for the next one, so each view is dead by the time the
+    buffer is reused.
+    """
+    buffer = await pool.acquire()
+    try:
+        view = memoryview(buffer)
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            remaining = length
+            while remaining > 0:
+                block = view[:min(len(view), remaining)]
+                read = await asyncio.to_thread(os.preadv, fd, [block], offset)
+                if not read:
+                    raise ValueError(f"{path} ended {remaining} bytes before the expected chunk end")
+                offset += read
+                remaining -= read
+                yield block[:read]
+        finally:
+            os.close(fd)
+    finally:
+        pool.release(buffer)
+
+
+def _parse_blob_id(result: Dict[str, Any]) -> Optional[str]:
+    """Pull the blob id out of a Walrus store response."""
+    # Check the two shapes the publisher actually returns before falling
+    # back to the legacy top-level field
+    if (created := result.get("newlyCreated")) is not None:
+        blob_object = created.get("blobObject", {})
+        blob_id = blob_object.get("blobId") or blob_object.get("blob_id")
+    elif (certified := result.get("alreadyCertified")) is not None:
+        blob_id = certified.get("blobId") or certified.get("blob_id")
+    else:
+        blob_id = None
+    return blob_id or result.get("blobId") or result.get("blob_id")
+
 
 class WalrusUploader:
     def __init__(self, publisher_url: str = Config.WALRUS_PUBLISHER_URL):
         self.publisher_url = publisher_url
         self.client: Optional[httpx.AsyncClient] = None
+        self._buffer_pool = BufferPool(FILE_STREAM_BUFFER_COUNT, FILE_STREAM_BLOCK_SIZE)
+
+    async def connect(self):
+        # One pooled client for the uploader's lifetime, so chunk uploads
+        # reuse keep-alive connections instead of handshaking per chunk
+        # HTTP/2 multiplexes concurrent chunk PUTs over one connection when
+        # the publisher supports it
+        self.client = httpx.AsyncClient(
+            http2=HAS_HTTP2,
+            timeout=httpx.Timeout(300.0, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=256,
+                max_keepalive_connections=256,
+                keepalive_expiry=60,
+            ),
+        )
+
+    async def disconnect(self):
+        if self.client:
+            await self.client.aclose()
+            self.client = None
 
     async def __aenter__(self):
-        self.client = httpx.AsyncClient(timeout=300.0)
+        await self.connect()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.client:
-            await self.client.aclose()
+        await self.disconnect()
 
     async def upload_chunk(
         self,
-        chunk_data: bytes,
+        chunk_data: Union[bytes, AsyncIterable[bytes], FileRange],
         chunk_index: int,
+        content_length: Optional[int] = None,
     ) -> str:
         if not self.client:
-            raise RuntimeError("Uploader not initialized. Use 'async with' context manager.")
+            raise RuntimeError("Uploader not initialized. Call connect() or use 'async with'.")
+
+        content: Union[bytes, AsyncIterable[bytes], AsyncIterator[memoryview]]
+        if isinstance(chunk_data, tuple):
+            # Stream the range from disk so only one block is resident at a time
+            path, offset, content_length = chunk_data
+            content = _stream_file_range(path, offset, content_length, self._buffer_pool)
+        else:
+            content = chunk_data
 
         headers = {
             "Content-Type": "application/octet-stream",
         }
+        if content_length is not None:
+            # Streamed bodies would otherwise go out chunked-encoded
+            headers["Content-Length"] = str(content_length)
 
         try:
             response = await self.client.put(
                 f"{self.publisher_url}/v1/blobs",
-                content=chunk_data,
+                content=content,
                 headers=headers,
             )
             response.raise_for_status()
@@ -42,18 +152,7 @@ class WalrusUploader:
             # { "newlyCreated": { "blobObject": { "blobId": "...", ... } } }
             # or { "alreadyCertified": { "blobId": "...", ... } }
             result: Any = response.json()
-            blob_id: Optional[str] = None
-            
-            if "newlyCreated" in result:
-                blob_object = result["newlyCreated"].get("blobObject", {})
-                blob_id = blob_object.get("blobId") or blob_object.get("blob_id")
-            elif "alreadyCertified" in result:
-                blob_id = result["alreadyCertified"].get("blobId") or result["alreadyCertified"].get("blob_id")
-            
-            # Fallback to legacy format for backwards compatibility
-            if not blob_id:
-                blob_id = result.get("blobId") or result.get("blob_id")
-
+            blob_id = _parse_blob_id(result)
             if not blob_id:
                 raise ValueError(f"No blob_id in response: {result}")
 
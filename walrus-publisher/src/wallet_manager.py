@@ -1,7 +1,9 @@
+import asyncio
 import os
-from typing import Optional
+import secrets
+from dataclasses import dataclass
+from typing import Iterable, Optional
 import redis.asyncio as redis
-from pydantic import BaseModel
 from config.platform import Config
 
 try:
@@ -11,8 +13,18 @@ except ImportError:
     HAS_PYSUI = False
     SuiKeyPair = None
 
+# Sizes of the random key and address used when pysui is unavailable
+FALLBACK_KEY_BYTES = 32
+FALLBACK_ADDRESS_BYTES = 20
+# Pools up to this size are generated inline: the executor hand-off costs
+# more than generating a few keys
+INLINE_GENERATION_MAX_WALLETS = 16
 
-class WalletInfo(BaseModel):
+
+# Internal only (never parsed from requests), so a slotted dataclass rather
+# than a validated pydantic model; pools create one per wallet
+@dataclass(frozen=True, slots=True)
+class WalletInfo:
     address: str
     private_key: str
 
@@ -23,62 +35,103 @@ class WalletManager:
         self.redis: Optional[redis.Redis] = None
 
     async def connect(self):
-        self.redis = await redis.from_url(self.redis_url, decode_responses=True)
+        # Connected once at startup (see UploadOrchestrator.connect) rather
+        # than checked per call; the client's pool replaces dropped
+        # connections itself. Binary replies: values are decoded only where
+        # they are handed back
+        self.redis = await redis.from_url(self.redis_url)
 
     async def disconnect(self):
         if self.redis:
             await self.redis.close()
 
-    async def _ensure_connected(self):
-        if not self.redis:
-            await self.connect()
+    def _require_redis(self) -> redis.Redis:
+        # Wallets only live in Redis; skipping the write would surface later
+        # as an unexplained get_wallet miss
+        if self.redis is None:
+            raise RuntimeError("WalletManager not connected. Call connect() first.")
+        return self.redis
 
-    async def create_ephemeral_wallet(self, session_id: str, index: int) -> WalletInfo:
-        await self._ensure_connected()
+    @staticmethod
+    def _generate_wallet() -> WalletInfo:
         if HAS_PYSUI and SuiKeyPair:
             keypair = SuiKeyPair.new_ed25519()
             private_key = keypair.private_key.hex()
             address = keypair.to_address().address
         else:
-            import secrets
-            private_key = secrets.token_hex(32)
-            address = f"0x{secrets.token_hex(20)}"
-        wallet_key = f"wallet:{session_id}:{index}"
-        if self.redis:
-            wallet_data = f"{private_key}|{address}"
-            await self.redis.setex(wallet_key, Config.SESSION_TTL, wallet_data)
+            private_key = secrets.token_hex(FALLBACK_KEY_BYTES)
+            address = f"0x{secrets.token_hex(FALLBACK_ADDRESS_BYTES)}"
         return WalletInfo(address=address, private_key=private_key)
 
+    @classmethod
+    def _generate_wallets(cls, count: int) -> list[WalletInfo]:
+        if HAS_PYSUI and SuiKeyPair:
+            return [cls._generate_wallet() for _ in range(count)]
+        # Placeholder wallets: draw the whole pool's randomness in one call
+        # and slice it, rather than two urandom reads per wallet
+        step = FALLBACK_KEY_BYTES + FALLBACK_ADDRESS_BYTES
+        entropy = secrets.token_bytes(step * count).hex()
+        key_chars = FALLBACK_KEY_BYTES * 2
+        return [
+            WalletInfo(
+                address=f"0x{entropy[start + key_chars:start + step * 2]}",
+                private_key=entropy[start:start + key_chars],
+            )
+            for start in range(0, step * count * 2, step * 2)
+        ]
+
+    async def create_ephemeral_wallet(self, session_id: str, index: int) -> WalletInfo:
+        client = self._require_redis()
+        wallet = self._generate_wallet()
+        wallet_key = f"wallet:{session_id}:{index}"
+        wallet_data = f"{wallet.private_key}|{wallet.address}"
+        await client.setex(wallet_key, Config.SESSION_TTL, wallet_data)
+        return wallet
+
     async def get_wallet(self, session_id: str, index: int) -> Optional[WalletInfo]:
-        await self._ensure_connected()
-        if not self.redis:
-            return None
+        client = self._require_redis()
         wallet_key = f"wallet:{session_id}:{index}"
-        wallet_data = await self.redis.get(wallet_key)
+        wallet_data = await client.get(wallet_key)
         if not wallet_data:
             return None
-        parts = wallet_data.split("|")
+        parts = wallet_data.split(b"|")
         if len(parts) != 2:
             return None
         private_key, address = parts
-        return WalletInfo(address=address, private_key=private_key)
+        return WalletInfo(address=address.decode("ascii"), private_key=private_key.decode("ascii"))
 
     async def create_wallet_pool(
         self, session_id: str, wallet_count: int
     ) -> list[WalletInfo]:
-        wallets = []
-        for i in range(wallet_count):
-            wallet = await self.create_ephemeral_wallet(session_id, i)
-            wallets.append(wallet)
+        client = self._require_redis()
+        # Generate every keypair up front, then store them in one round-trip.
+        # Key generation is CPU-bound; keep it off the event loop for large pools
+        if wallet_count <= INLINE_GENERATION_MAX_WALLETS:
+            wallets = self._generate_wallets(wallet_count)
+        else:
+            wallets = await asyncio.get_running_loop().run_in_executor(
+                None, self._generate_wallets, wallet_count
+            )
+        async with client.pipeline(transaction=False) as pipe:
+            for i, wallet in enumerate(wallets):
+                pipe.setex(
+                    f"wallet:{session_id}:{i}",
+                    Config.SESSION_TTL,
+                    f"{wallet.private_key}|{wallet.address}",
+                )
+            await pipe.execute()
         return wallets
 
-    async def cleanup_session(self, session_id: str, wallet_count: int):
-        await self._ensure_connected()
-        if not self.redis:
-            return
-        for i in range(wallet_count):
-            wallet_key = f"wallet:{session_id}:{i}"
-            await self.redis.delete(wallet_key)
-        session_keys = await self.redis.keys(f"session:{session_id}:*")
-        if session_keys:
-            await self.redis.delete(*session_keys)
+    async def cleanup_session(
+        self, session_id: str, wallet_count: int, session_keys: Iterable[str] = ()
+    ):
+        client = self._require_redis()
+        # Every key is known up front (wallets by index, session keys from the
+        # caller), so no KEYS/SCAN; all deletes go out in one round-trip
+        async with client.pipeline(transaction=False) as pipe:
+            for i in range(wallet_count):
+                pipe.delete(f"wallet:{session_id}:{i}")
+            session_keys = list(session_keys)
+            if session_keys:
+                pipe.delete(*session_keys)
+            await pipe.execute()
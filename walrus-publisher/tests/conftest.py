@@ -1,33 +1,53 @@
+import time
 import pytest
-import asyncio
+import fakeredis
 import fakeredis.aioredis
+from hypothesis import HealthCheck, settings
 from unittest.mock import AsyncMock, patch
-from config.platform import Config
 from orchestrator import UploadOrchestrator
 from transaction_builder import TransactionBuilder
 from chunking import ChunkingOrchestrator
 
 
-@pytest.fixture
-def event_loop():
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+# Reproducible, quick property runs by default; pass
+# --hypothesis-profile=thorough for a wider random search
+settings.register_profile(
+    "fast",
+    max_examples=25,
+    derandomize=True,
+    print_blob=False,
+    deadline=None,
+    suppress_health_check=[HealthCheck.too_slow],
+)
+settings.register_profile(
+    "thorough",
+    max_examples=500,
+    deadline=None,
+    suppress_health_check=[HealthCheck.too_slow],
+)
+settings.load_profile("fast")
 
 
-@pytest.fixture
-async def redis_client():
-    client = fakeredis.aioredis.FakeRedis()
+@pytest.fixture(scope="session")
+async def fake_redis():
+    """One in-memory Redis server shared by the whole test session"""
+    client = fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer())
     yield client
-    await client.flushall()
-    await client.close()
+    await client.aclose()
 
 
 @pytest.fixture
-async def orchestrator(redis_client):
+async def redis_client(fake_redis):
+    yield fake_redis
+    await fake_redis.flushall()
+
+
+@pytest.fixture(scope="session")
+async def orchestrator(fake_redis):
+    """One orchestrator for the session; integration tests reset it per test"""
     orch = UploadOrchestrator("fake://redis")
-    orch.redis = redis_client
-    orch.wallet_manager.redis = redis_client
+    orch.redis = fake_redis
+    orch.wallet_manager.redis = fake_redis
     return orch
 
 
@@ -46,29 +66,40 @@ def chunking_orchestrator():
 
 @pytest.fixture
 def mock_walrus_uploader():
-    with patch("main.WalrusUploader") as mock:
-        uploader_instance = AsyncMock()
-        uploader_instance.upload_chunk = AsyncMock(return_value="test_blob_id_123")
-        uploader_instance.__aenter__.return_value = uploader_instance
-        uploader_instance.__aexit__.return_value = None
-        mock.return_value = uploader_instance
-        yield mock
+    uploader_instance = AsyncMock()
+    uploader_instance.upload_chunk = AsyncMock(return_value="test_blob_id_123")
+    with patch("main.uploader", uploader_instance):
+        yield uploader_instance
 
 
-@pytest.fixture
-async def e2e_setup(redis_client):
-    """Initialize app globals for E2E testing"""
+@pytest.fixture(scope="session")
+async def app_state(fake_redis):
+    """Initialize app globals once for every E2E test"""
     import main
     orch = UploadOrchestrator("fake://redis")
-    orch.redis = redis_client
-    orch.wallet_manager.redis = redis_client
+    orch.redis = fake_redis
+    orch.wallet_manager.redis = fake_redis
     tx_builder = TransactionBuilder(
         walrus_package_id="0x123456789abcdef",
         walrus_system_object="0x0000000000000000000000000000000000000000000000000000000000000000",
     )
     main.orchestrator = orch
     main.transaction_builder = tx_builder
-    main.start_time = __import__('time').time()
-    yield
+    main.start_time = time.time()
+    yield orch, tx_builder, fake_redis
     main.orchestrator = None
     main.transaction_builder = None
+
+
+@pytest.fixture
+async def e2e_state(app_state):
+    """Per-test reset of the state E2E requests mutate"""
+    orch, _, fake_redis = app_state
+    # Sessions from wider-scoped fixtures outlive the test; only the
+    # in-memory session is read back, so flushing Redis doesn't affect them
+    shared_sessions = set(orch.sessions)
+    yield app_state
+    for session_id in set(orch.sessions) - shared_sessions:
+        del orch.sessions[session_id]
+    orch._missing_sessions.clear()
+    await fake_redis.flushall()
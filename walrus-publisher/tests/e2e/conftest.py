@@ -0,0 +1,35 @@
+import pytest
+import httpx
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from main import app as fastapi_app
+
+
+@pytest.fixture(scope="session")
+def app():
+    """The FastAPI app, imported once for every E2E module"""
+    return fastapi_app
+
+
+@pytest.fixture(scope="session")
+async def test_client(app, app_state):
+    """Create an in-process async client shared by every test"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def no_auth(monkeypatch):
+    """Run with API key checks disabled"""
+    monkeypatch.setattr('main.api_keys', set())
+
+
+@pytest.fixture
+def with_auth(monkeypatch):
+    """Require an API key; returns the headers that satisfy it"""
+    monkeypatch.setattr('main.api_keys', {'test-key'})
+    return {'Authorization': 'Bearer test-key'}
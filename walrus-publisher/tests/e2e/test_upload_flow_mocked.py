@@ -0,0 +1,143 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+import httpx
+
+from models import ChunkPlan
+from orchestrator import UploadOrchestrator
+from transaction_builder import TransactionBuilder
+from wallet_manager import WalletInfo
+
+
+@pytest.fixture
+async def light_client(app, monkeypatch):
+    """Client over a Redis-less orchestrator, for paths that never find a session"""
+    tx_builder = TransactionBuilder(
+        walrus_package_id="0x123456789abcdef",
+        walrus_system_object="0x0000000000000000000000000000000000000000000000000000000000000000",
+    )
+    monkeypatch.setattr('main.orchestrator', UploadOrchestrator("fake://redis"))
+    monkeypatch.setattr('main.transaction_builder', tx_builder)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+WALLET = WalletInfo(
+    address='0x1234567890123456789012345678901234567890',
+    private_key='test_private_key',
+)
+
+
+@pytest.fixture(scope="module")
+def mocked_services():
+    """Swap main's orchestrator and transaction builder once per module"""
+    mock_orch = SimpleNamespace(
+        create_upload_session=AsyncMock(
+            return_value=(
+                'session_123',
+                [ChunkPlan(index=0, size=9, wallet_address=WALLET.address)],
+            )
+        ),
+        get_session=AsyncMock(
+            return_value=SimpleNamespace(
+                session_id='session_123',
+                chunks=[Mock()],
+                chunks_uploaded=1,
+                blob_ids={0: 'test_blob_id_123'},
+            )
+        ),
+        record_chunk_upload=AsyncMock(),
+        get_wallets_for_chunks=AsyncMock(return_value={0: WALLET}),
+        bump_transaction_counters=AsyncMock(),
+    )
+    mock_tx = SimpleNamespace(
+        build_register_blob_transactions=Mock(return_value=['base64_encoded_tx_bytes']),
+    )
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr('main.orchestrator', mock_orch)
+        mp.setattr('main.transaction_builder', mock_tx)
+        yield mock_orch, mock_tx
+
+
+@pytest.mark.e2e
+async def test_full_upload_flow_mock(app, mocked_services, mock_walrus_uploader, no_auth):
+    """E2E test: init, chunk, transactions and finalize against mocked services"""
+    mock_orch, mock_tx = mocked_services
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post('/upload/init', json={'file_size': 9})
+        assert response.status_code == 200
+        data = response.json()
+        assert data['session_id'] == 'session_123'
+        assert data['wallet_count'] == 1
+
+        response = await client.post(
+            '/upload/session_123/chunk/0',
+            files={'file': ('chunk.bin', b'test_data')},
+        )
+        assert response.status_code == 200
+        assert response.json() == {
+            'blob_id': 'test_blob_id_123',
+            'chunk_index': 0,
+            'size_bytes': 9,
+        }
+        mock_orch.record_chunk_upload.assert_awaited_once_with(
+            'session_123', 0, 'test_blob_id_123'
+        )
+
+        response = await client.get('/upload/session_123/transactions')
+        assert response.status_code == 200
+        assert response.json()['transactions'] == [{
+            'tx_bytes': 'base64_encoded_tx_bytes',
+            'sub_wallet_address': WALLET.address,
+            'blob_id': 'test_blob_id_123',
+            'chunk_index': 0,
+        }]
+        mock_tx.build_register_blob_transactions.assert_called_once_with(
+            [('test_blob_id_123', WALLET.address)]
+        )
+
+        response = await client.post(
+            '/upload/session_123/finalize',
+            json={'signed_transactions': [{'tx_bytes': 'signed', 'digest': '0xabc'}]},
+        )
+        assert response.status_code == 200
+        assert response.json()['transaction_digests'] == ['0xabc']
+        mock_orch.bump_transaction_counters.assert_awaited_once_with(
+            'session_123', submitted=1
+        )
+
+
+async def test_chunk_upload_without_uploader_returns_503(light_client, monkeypatch, no_auth):
+    """Test /upload/chunk reports 503 when the uploader was never connected"""
+    monkeypatch.setattr('main.uploader', None)
+    response = await light_client.post(
+        '/upload/session_123/chunk/0',
+        files={'file': ('test.bin', b'test_data')},
+    )
+    assert response.status_code == 503
+
+
+async def test_chunk_upload_missing_session(light_client, mock_walrus_uploader, no_auth):
+    """Test /upload/chunk returns 404 for missing session"""
+    response = await light_client.post(
+        '/upload/nonexistent_session/chunk/0',
+        files={'file': ('test.bin', b'test_data')},
+    )
+    assert response.status_code == 404
+
+
+async def test_get_transactions_missing_session(light_client, no_auth):
+    """Test /transactions returns 404 for missing session"""
+    response = await light_client.get('/upload/nonexistent_session/transactions')
+    assert response.status_code == 404
+
+
+async def test_finalize_missing_session(light_client, no_auth):
+    """Test /finalize returns 404 for missing session"""
+    response = await light_client.post(
+        '/upload/nonexistent_session/finalize',
+        json={'signed_transactions': []},
+    )
+    assert response.status_code == 404
@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+async def reset_orchestrator(orchestrator, redis_client):
+    """Drop in-memory sessions; redis_client flushes Redis on teardown"""
+    yield
+    orchestrator.sessions.clear()
+    orchestrator._missing_sessions.clear()
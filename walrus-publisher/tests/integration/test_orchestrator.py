@@ -1,12 +1,16 @@
+import asyncio
 import pytest
 import json
+import time
 from unittest.mock import AsyncMock, patch
-from orchestrator import UploadOrchestrator
+
+
+MIB = 1024 * 1024
 
 
 @pytest.mark.asyncio
 async def test_create_upload_session(orchestrator):
-    session_id, chunk_plans = await orchestrator.create_upload_session(100 * 1024 * 1024)
+    session_id, chunk_plans = await orchestrator.create_upload_session(100 * MIB)
     assert session_id
     assert len(chunk_plans) > 0
     for plan in chunk_plans:
@@ -17,7 +21,7 @@ async def test_create_upload_session(orchestrator):
 
 @pytest.mark.asyncio
 async def test_get_session_from_memory(orchestrator):
-    session_id, _ = await orchestrator.create_upload_session(50 * 1024 * 1024)
+    session_id, _ = await orchestrator.create_upload_session(50 * MIB)
     session = await orchestrator.get_session(session_id)
     assert session is not None
     assert session.session_id == session_id
@@ -29,9 +33,22 @@ async def test_get_nonexistent_session(orchestrator):
     assert session is None
 
 
+@pytest.mark.asyncio
+async def test_missing_session_is_negatively_cached(orchestrator):
+    with patch.object(orchestrator.redis, "exists", wraps=orchestrator.redis.exists) as exists:
+        assert await orchestrator.get_session("nonexistent_id") is None
+        assert await orchestrator.get_session("nonexistent_id") is None
+    assert exists.call_count == 1
+
+    with patch("orchestrator.time.monotonic", return_value=time.monotonic() + 10):
+        with patch.object(orchestrator.redis, "exists", wraps=orchestrator.redis.exists) as exists:
+            assert await orchestrator.get_session("nonexistent_id") is None
+    assert exists.call_count == 1
+
+
 @pytest.mark.asyncio
 async def test_record_chunk_upload(orchestrator):
-    session_id, _ = await orchestrator.create_upload_session(100 * 1024 * 1024)
+    session_id, _ = await orchestrator.create_upload_session(100 * MIB)
     await orchestrator.record_chunk_upload(session_id, 0, "blob_id_123")
     session = await orchestrator.get_session(session_id)
     assert session is not None
@@ -40,7 +57,7 @@ async def test_record_chunk_upload(orchestrator):
 
 @pytest.mark.asyncio
 async def test_get_upload_status(orchestrator):
-    session_id, chunk_plans = await orchestrator.create_upload_session(10 * 1024 * 1024)
+    session_id, chunk_plans = await orchestrator.create_upload_session(10 * MIB)
     status = await orchestrator.get_upload_status(session_id)
     assert status is not None
     assert status.session_id == session_id
@@ -50,7 +67,7 @@ async def test_get_upload_status(orchestrator):
 
 @pytest.mark.asyncio
 async def test_record_transaction_submitted(orchestrator):
-    session_id, _ = await orchestrator.create_upload_session(50 * 1024 * 1024)
+    session_id, _ = await orchestrator.create_upload_session(50 * MIB)
     initial_status = await orchestrator.get_upload_status(session_id)
     initial_submitted = initial_status.transactions_submitted
     await orchestrator.record_transaction_submitted(session_id)
@@ -60,20 +77,40 @@ async def test_record_transaction_submitted(orchestrator):
 
 @pytest.mark.asyncio
 async def test_cleanup_session(orchestrator):
-    session_id, _ = await orchestrator.create_upload_session(30 * 1024 * 1024)
+    session_id, _ = await orchestrator.create_upload_session(30 * MIB)
     assert session_id in orchestrator.sessions
     await orchestrator.cleanup_session(session_id)
     assert session_id not in orchestrator.sessions
+    assert not await orchestrator.redis.exists(f"session:{session_id}")
+
+
+@pytest.mark.asyncio
+async def test_active_session_count(orchestrator):
+    assert orchestrator.active_session_count == 0
+    session_id, _ = await orchestrator.create_upload_session(30 * MIB)
+    assert orchestrator.active_session_count == 1
+    await orchestrator.cleanup_session(session_id)
+    assert orchestrator.active_session_count == 0
 
 
 @pytest.mark.asyncio
 async def test_get_wallet_for_chunk(orchestrator):
-    session_id, _ = await orchestrator.create_upload_session(100 * 1024 * 1024)
+    session_id, _ = await orchestrator.create_upload_session(100 * MIB)
     wallet = await orchestrator.get_wallet_for_chunk(session_id, 0)
     assert wallet is not None
     assert wallet.address
 
 
+@pytest.mark.asyncio
+async def test_get_wallets_for_chunks(orchestrator):
+    session_id, chunk_plans = await orchestrator.create_upload_session(100 * MIB)
+    indices = [plan.index for plan in chunk_plans]
+    wallets = await orchestrator.get_wallets_for_chunks(session_id, indices + [len(indices)])
+    assert sorted(wallets) == indices
+    for plan in chunk_plans:
+        assert wallets[plan.index].address == plan.wallet_address
+
+
 @pytest.mark.asyncio
 async def test_wallet_manager_disconnect(orchestrator):
     """Test wallet manager can disconnect"""
@@ -88,7 +125,7 @@ async def test_multiple_sessions_concurrent(orchestrator):
     """Test creating multiple sessions concurrently"""
     import asyncio
     tasks = [
-        orchestrator.create_upload_session(10 * 1024 * 1024)
+        orchestrator.create_upload_session(10 * MIB)
         for _ in range(3)
     ]
     results = await asyncio.gather(*tasks)
@@ -102,7 +139,7 @@ async def test_wallet_cleanup_session(orchestrator):
     """Test wallet manager cleanup_session"""
     session_id = "test_session_cleanup"
     # Create a session
-    _, chunk_plans = await orchestrator.create_upload_session(10 * 1024 * 1024)
+    _, chunk_plans = await orchestrator.create_upload_session(10 * MIB)
     wallet_count = len(chunk_plans)
 
     # Cleanup should work
@@ -112,7 +149,7 @@ async def test_wallet_cleanup_session(orchestrator):
 @pytest.mark.asyncio
 async def test_session_to_status_conversion(orchestrator):
     """Test converting UploadSession to UploadStatus"""
-    session_id, _ = await orchestrator.create_upload_session(10 * 1024 * 1024)
+    session_id, _ = await orchestrator.create_upload_session(10 * MIB)
     session = await orchestrator.get_session(session_id)
 
     # Convert to status
@@ -125,7 +162,7 @@ async def test_session_to_status_conversion(orchestrator):
 @pytest.mark.asyncio
 async def test_get_wallet_for_valid_chunk(orchestrator):
     """Test getting wallet for existing chunk"""
-    session_id, chunk_plans = await orchestrator.create_upload_session(10 * 1024 * 1024)
+    session_id, chunk_plans = await orchestrator.create_upload_session(10 * MIB)
     # Get wallet for first chunk
     if chunk_plans:
         first_chunk_index = chunk_plans[0].index
@@ -136,13 +173,229 @@ async def test_get_wallet_for_valid_chunk(orchestrator):
 
 
 @pytest.mark.asyncio
-async def test_invalid_file_size():
+async def test_invalid_file_size(orchestrator):
     """Test that zero file size raises"""
-    import fakeredis.aioredis
-    redis_client = fakeredis.aioredis.FakeRedis()
-    orch = UploadOrchestrator("fake://redis")
-    orch.redis = redis_client
-    orch.wallet_manager.redis = redis_client
-
     with pytest.raises(ValueError):
-        await orch.create_upload_session(0)
+        await orchestrator.create_upload_session(0)
+
+
+@pytest.mark.asyncio
+async def test_record_chunk_upload_publishes_status(orchestrator):
+    session_id, _ = await orchestrator.create_upload_session(10 * MIB)
+    pubsub = orchestrator.redis.pubsub()
+    await pubsub.subscribe(orchestrator.status_channel(session_id))
+    await pubsub.get_message(timeout=1)  # subscribe confirmation
+
+    await orchestrator.record_chunk_upload(session_id, 0, "blob_id_123")
+
+    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1)
+    await pubsub.aclose()
+    assert message is not None
+    status = json.loads(message["data"])
+    assert status["session_id"] == session_id
+    assert status["chunks_uploaded"] == 1
+
+
+@pytest.mark.asyncio
+async def test_session_progress_stored_as_hash(orchestrator):
+    session_id, chunk_plans = await orchestrator.create_upload_session(10 * MIB)
+    await orchestrator.record_chunk_upload(session_id, 0, "blob_id_123")
+    await orchestrator.record_transaction_submitted(session_id)
+
+    stored = await orchestrator.redis.hgetall(f"session:{session_id}")
+    assert int(stored[b"chunk_count"]) == len(chunk_plans)
+    assert int(stored[b"chunks_uploaded"]) == 1
+    assert int(stored[b"bytes_uploaded"]) == chunk_plans[0].size
+    assert int(stored[b"transactions_submitted"]) == 1
+    assert await orchestrator.redis.ttl(f"session:{session_id}") > 0
+
+
+@pytest.mark.asyncio
+async def test_record_chunk_uploads_batch(orchestrator):
+    session_id, chunk_plans = await orchestrator.create_upload_session(10 * MIB)
+    uploads = [(plan.index, f"blob_{plan.index}") for plan in chunk_plans]
+
+    await orchestrator.record_chunk_uploads_batch(session_id, uploads)
+
+    status = await orchestrator.get_upload_status(session_id)
+    assert status.status == "completed"
+    assert status.bytes_uploaded == 10 * MIB
+    stored = await orchestrator.redis.hgetall(f"session:{session_id}:chunks")
+    assert {int(k): v.decode() for k, v in stored.items()} == dict(uploads)
+    counters = await orchestrator.redis.hgetall(f"session:{session_id}")
+    assert int(counters[b"chunks_uploaded"]) == len(chunk_plans)
+
+
+@pytest.mark.asyncio
+async def test_record_chunk_uploads_batch_rejects_unknown_chunk(orchestrator):
+    session_id, _ = await orchestrator.create_upload_session(10 * MIB)
+    with pytest.raises(ValueError, match="Chunk 99 not found"):
+        await orchestrator.record_chunk_uploads_batch(session_id, [(0, "blob_0"), (99, "blob_99")])
+    status = await orchestrator.get_upload_status(session_id)
+    assert status.chunks_uploaded == 0
+
+
+@pytest.mark.asyncio
+async def test_upload_all_retries_failed_chunks(orchestrator):
+    session_id, chunk_plans = await orchestrator.create_upload_session(10 * MIB)
+    attempts = {}
+
+    async def upload_chunk(chunk_data, chunk_index):
+        attempts[chunk_index] = attempts.get(chunk_index, 0) + 1
+        if chunk_index == 0 and attempts[chunk_index] == 1:
+            raise RuntimeError("Failed to upload chunk 0: connection reset")
+        return f"blob_{chunk_index}"
+
+    uploader = AsyncMock()
+    uploader.upload_chunk = AsyncMock(side_effect=upload_chunk)
+    chunks = [(plan.index, b"x") for plan in chunk_plans]
+
+    with patch("orchestrator.asyncio.sleep", new_callable=AsyncMock):
+        assert await orchestrator.upload_all(session_id, chunks, uploader, concurrency=2)
+
+    assert attempts[0] == 2
+    status = await orchestrator.get_upload_status(session_id)
+    assert status.status == "completed"
+    assert status.error is None
+
+
+@pytest.mark.asyncio
+async def test_upload_all_marks_session_error_after_retry_cap(orchestrator):
+    session_id, chunk_plans = await orchestrator.create_upload_session(10 * MIB)
+    uploader = AsyncMock()
+    uploader.upload_chunk = AsyncMock(side_effect=RuntimeError("Failed to upload chunk 0: boom"))
+
+    with patch("orchestrator.asyncio.sleep", new_callable=AsyncMock):
+        ok = await orchestrator.upload_all(session_id, [(0, b"x")], uploader)
+
+    assert not ok
+    assert uploader.upload_chunk.await_count == 3
+    status = await orchestrator.get_upload_status(session_id)
+    assert status.error == "Failed to upload chunk 0: boom"
+    stored = await orchestrator.redis.hget(f"session:{session_id}", "error")
+    assert stored == b"Failed to upload chunk 0: boom"
+
+
+@pytest.mark.asyncio
+async def test_upload_all_records_chunks_in_batches(orchestrator):
+    session_id, chunk_plans = await orchestrator.create_upload_session(10 * MIB)
+    assert len(chunk_plans) == 4
+    uploader = AsyncMock()
+    uploader.upload_chunk = AsyncMock(side_effect=lambda data, index: f"blob_{index}")
+    chunks = [(plan.index, b"x") for plan in chunk_plans]
+
+    with patch("orchestrator.UPLOAD_RECORD_BATCH_SIZE", 2), \
+         patch.object(orchestrator.redis, "pipeline", wraps=orchestrator.redis.pipeline) as pipeline:
+        assert await orchestrator.upload_all(session_id, chunks, uploader, concurrency=2)
+
+    assert pipeline.call_count == 2
+    status = await orchestrator.get_upload_status(session_id)
+    assert status.chunks_uploaded == 4
+    stored = await orchestrator.redis.hgetall(f"session:{session_id}:chunks")
+    assert stored == {str(i).encode(): f"blob_{i}".encode() for i in range(4)}
+
+
+@pytest.mark.asyncio
+async def test_upload_all_flushes_partial_batch_on_interval(orchestrator):
+    session_id, chunk_plans = await orchestrator.create_upload_session(10 * MIB)
+    release_last = asyncio.Event()
+
+    async def upload_chunk(chunk_data, chunk_index):
+        if chunk_index == 3:
+            await release_last.wait()
+        return f"blob_{chunk_index}"
+
+    uploader = AsyncMock()
+    uploader.upload_chunk = AsyncMock(side_effect=upload_chunk)
+    chunks = [(plan.index, b"x") for plan in chunk_plans]
+    upload = asyncio.create_task(orchestrator.upload_all(session_id, chunks, uploader, concurrency=4))
+
+    # The first three land well below the batch size; the interval flushes them
+    session = await orchestrator.get_session(session_id)
+    async with asyncio.timeout(5):
+        while session.chunks_uploaded < 3:
+            await asyncio.sleep(0.01)
+    assert not upload.done()
+
+    release_last.set()
+    assert await upload
+    assert session.chunks_uploaded == 4
+
+
+@pytest.mark.asyncio
+async def test_upload_all_stops_siblings_on_unretryable_error(orchestrator):
+    session_id, chunk_plans = await orchestrator.create_upload_session(10 * MIB)
+    started = []
+    sibling_cancelled = asyncio.Event()
+
+    async def upload_chunk(chunk_data, chunk_index):
+        started.append(chunk_index)
+        if chunk_index == 0:
+            await asyncio.sleep(0)
+            raise ValueError("No blob_id in response: {}")
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            sibling_cancelled.set()
+            raise
+
+    uploader = AsyncMock()
+    uploader.upload_chunk = AsyncMock(side_effect=upload_chunk)
+    chunks = [(index, b"x") for index in range(4)]
+
+    ok = await orchestrator.upload_all(session_id, chunks, uploader, concurrency=2)
+
+    assert not ok
+    assert sibling_cancelled.is_set()
+    assert started == [0, 1]
+    status = await orchestrator.get_upload_status(session_id)
+    assert status.error == "No blob_id in response: {}"
+    stored = await orchestrator.redis.hget(f"session:{session_id}", "error")
+    assert stored == b"No blob_id in response: {}"
+
+
+@pytest.mark.asyncio
+async def test_status_updated_at_tracks_last_update(orchestrator):
+    session_id, chunk_plans = await orchestrator.create_upload_session(10 * MIB)
+    session = await orchestrator.get_session(session_id)
+    assert session.to_status().updated_at == session.created_at
+
+    with patch("orchestrator.time.monotonic_ns", return_value=session.updated_at_ns + 2_000_000_000):
+        await orchestrator.record_chunk_upload(session_id, chunk_plans[0].index, "blob_0")
+
+    status = session.to_status()
+    assert (status.updated_at - status.created_at).total_seconds() == 2
+
+
+@pytest.mark.asyncio
+async def test_bump_transaction_counters(orchestrator):
+    session_id, _ = await orchestrator.create_upload_session(10 * MIB)
+    await orchestrator.bump_transaction_counters(session_id, submitted=3, confirmed=2)
+
+    status = await orchestrator.get_upload_status(session_id)
+    assert status.transactions_submitted == 3
+    assert status.transactions_confirmed == 2
+    stored = await orchestrator.redis.hgetall(f"session:{session_id}")
+    assert int(stored[b"transactions_submitted"]) == 3
+    assert int(stored[b"transactions_confirmed"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_record_chunk_uploads_batch_splits_large_hset(orchestrator):
+    session_id, chunk_plans = await orchestrator.create_upload_session(10 * MIB)
+    uploads = [(plan.index, f"blob_{plan.index}") for plan in chunk_plans]
+
+    with patch("orchestrator.MAX_HSET_FIELDS", 3):
+        await orchestrator.record_chunk_uploads_batch(session_id, uploads)
+
+    stored = await orchestrator.redis.hgetall(f"session:{session_id}:chunks")
+    assert {int(k): v.decode() for k, v in stored.items()} == dict(uploads)
+
+
+@pytest.mark.asyncio
+async def test_session_id_is_compact_hex(orchestrator):
+    session_id, _ = await orchestrator.create_upload_session(10 * MIB)
+    assert len(session_id) == 32
+    int(session_id, 16)
+    session = await orchestrator.get_session(session_id)
+    assert session.redis_key == f"session:{session_id}"
@@ -1,79 +1,108 @@
 import pytest
-from hypothesis import given, strategies as st
+from hypothesis import given, settings, strategies as st
 from chunking import ChunkingOrchestrator, ChunkInfo
+from config.platform import Config
+
+
+MAX_FILE_SIZE = 13 * (1024**3)
+
+# Plan shape changes at the chunk size limits, so always try the sizes
+# around them alongside random ones
+FILE_SIZES = st.one_of(
+    st.sampled_from([
+        1,
+        Config.CHUNK_MIN_SIZE - 1,
+        Config.CHUNK_MIN_SIZE,
+        Config.CHUNK_MIN_SIZE + 1,
+        Config.CHUNK_MAX_SIZE,
+        Config.CHUNK_MAX_SIZE + 1,
+        MAX_FILE_SIZE,
+    ]),
+    st.integers(min_value=1, max_value=MAX_FILE_SIZE),
+)
+
+
+@pytest.fixture(scope="module")
+def orch():
+    return ChunkingOrchestrator()
 
 
 class TestChunkingOrchestrator:
-    def test_calculate_wallet_count_small_file(self):
-        orch = ChunkingOrchestrator()
+    def test_calculate_wallet_count_small_file(self, orch):
         count = orch.calculate_wallet_count(100 * 1024 * 1024)
         assert count == 4
 
-    def test_calculate_wallet_count_large_file(self):
-        orch = ChunkingOrchestrator()
+    def test_calculate_wallet_count_large_file(self, orch):
         count = orch.calculate_wallet_count(10 * 1024**3)
         assert count <= 256
         assert count >= 4
 
-    def test_calculate_wallet_count_respects_max(self):
-        orch = ChunkingOrchestrator()
+    def test_calculate_wallet_count_respects_max(self, orch):
         count = orch.calculate_wallet_count(100 * 1024**3)
         assert count == orch.max_wallets
 
-    def test_calculate_chunk_size(self):
-        orch = ChunkingOrchestrator()
+    def test_calculate_chunk_size(self, orch):
         size = orch.calculate_chunk_size(100 * 1024 * 1024, 4)
         assert orch.min_chunk_size <= size <= orch.max_chunk_size
 
-    def test_plan_chunks_zero_bytes(self):
-        orch = ChunkingOrchestrator()
+    def test_plan_chunks_zero_bytes(self, orch):
         chunks = orch.plan_chunks(0)
         assert len(chunks) == 0
 
-    def test_plan_chunks_one_byte(self):
-        orch = ChunkingOrchestrator()
+    def test_plan_chunks_one_byte(self, orch):
         chunks = orch.plan_chunks(1)
         assert len(chunks) == 1
         assert chunks[0].size == 1
 
-    def test_plan_chunks_small_file(self):
-        orch = ChunkingOrchestrator()
+    def test_plan_chunks_small_file(self, orch):
         size = 10 * 1024 * 1024
         chunks = orch.plan_chunks(size)
         assert len(chunks) > 0
         total = sum(c.size for c in chunks)
         assert total == size
 
-    def test_plan_chunks_large_file(self):
-        orch = ChunkingOrchestrator()
+    def test_plan_chunks_large_file(self, orch):
         size = 10 * 1024**3
         chunks = orch.plan_chunks(size)
         total = sum(c.size for c in chunks)
         assert total == size
 
-    def test_plan_chunks_indices_sequential(self):
-        orch = ChunkingOrchestrator()
+    def test_plan_chunks_indices_sequential(self, orch):
         chunks = orch.plan_chunks(100 * 1024 * 1024)
         for i, chunk in enumerate(chunks):
             assert chunk.index == i
 
-    def test_plan_chunks_offsets_correct(self):
-        orch = ChunkingOrchestrator()
+    def test_plan_chunks_offsets_correct(self, orch):
         chunks = orch.plan_chunks(10 * 1024 * 1024)
         offset = 0
         for chunk in chunks:
             assert chunk.offset == offset
             offset += chunk.size
 
-    def test_plan_chunks_wallet_distribution(self):
-        orch = ChunkingOrchestrator()
+    def test_plan_chunks_wallet_distribution(self, orch):
         chunks = orch.plan_chunks(100 * 1024 * 1024)
         wallet_count = orch.calculate_wallet_count(100 * 1024 * 1024)
         wallets_used = set(c.wallet_index for c in chunks)
         assert len(wallets_used) <= wallet_count
 
-    def test_validate_chunks_valid(self):
-        orch = ChunkingOrchestrator()
+    def test_plan_chunks_reuses_cached_plan(self, orch):
+        first = orch.plan_chunks(10 * 1024 * 1024)
+        second = orch.plan_chunks(10 * 1024 * 1024)
+        assert first == second
+        assert first is not second
+        assert all(a is b for a, b in zip(first, second))
+
+    def test_plan_chunks_cache_keyed_on_limits(self, orch, monkeypatch):
+        default_plan = orch.plan_chunks(10 * 1024 * 1024)
+        monkeypatch.setattr(orch, "max_chunk_size", orch.min_chunk_size)
+        assert len(default_plan) == 4
+        assert len(orch.plan_chunks(10 * 1024 * 1024)) == 10
+
+    def test_chunk_info_is_slotted(self):
+        chunk = ChunkInfo(index=0, size=1024, wallet_index=0, offset=0)
+        assert not hasattr(chunk, "__dict__")
+
+    def test_validate_chunks_valid(self, orch):
         chunk_size = orch.min_chunk_size
         chunks = [
             ChunkInfo(index=0, size=chunk_size, wallet_index=0, offset=0),
@@ -81,41 +110,35 @@ class TestChunkingOrchestrator:
         ]
         assert orch.validate_chunks(chunk_size * 2, chunks) is True
 
-    def test_validate_chunks_size_mismatch(self):
-        orch = ChunkingOrchestrator()
+    def test_validate_chunks_size_mismatch(self, orch):
         chunks = [
             ChunkInfo(index=0, size=1024, wallet_index=0, offset=0),
         ]
         assert orch.validate_chunks(2048, chunks) is False
 
-    def test_validate_chunks_index_mismatch(self):
-        orch = ChunkingOrchestrator()
+    def test_validate_chunks_index_mismatch(self, orch):
         chunks = [
             ChunkInfo(index=2, size=1024, wallet_index=0, offset=0),
         ]
         assert orch.validate_chunks(1024, chunks) is False
 
-    def test_validate_chunks_offset_mismatch(self):
-        orch = ChunkingOrchestrator()
+    def test_validate_chunks_offset_mismatch(self, orch):
         chunks = [
             ChunkInfo(index=0, size=1024, wallet_index=0, offset=100),
             ChunkInfo(index=1, size=1024, wallet_index=1, offset=1124),
         ]
         assert orch.validate_chunks(2048, chunks) is False
 
-    def test_validate_chunks_size_too_large(self):
-        orch = ChunkingOrchestrator()
+    def test_validate_chunks_size_too_large(self, orch):
         chunks = [
             ChunkInfo(index=0, size=orch.max_chunk_size + 1, wallet_index=0, offset=0),
         ]
         assert orch.validate_chunks(orch.max_chunk_size + 1, chunks) is False
 
-    def test_validate_chunks_empty(self):
-        orch = ChunkingOrchestrator()
+    def test_validate_chunks_empty(self, orch):
         assert orch.validate_chunks(100, []) is False
 
-    def test_validate_chunks_last_chunk_can_be_small(self):
-        orch = ChunkingOrchestrator()
+    def test_validate_chunks_last_chunk_can_be_small(self, orch):
         chunks = [
             ChunkInfo(index=0, size=orch.max_chunk_size, wallet_index=0, offset=0),
             ChunkInfo(index=1, size=100, wallet_index=1, offset=orch.max_chunk_size),
@@ -124,28 +147,21 @@ class TestChunkingOrchestrator:
 
 
 class TestChunkingOrchestrator_PropertyBased:
-    @given(
-        file_size=st.integers(min_value=1, max_value=13 * (1024**3)),
-    )
-    def test_planned_chunks_total_size(self, file_size):
-        orch = ChunkingOrchestrator()
+    @settings(max_examples=30)
+    @given(file_size=FILE_SIZES)
+    def test_planned_chunks_total_size(self, orch, file_size):
         chunks = orch.plan_chunks(file_size)
         total = sum(c.size for c in chunks)
         assert total == file_size, f"Total {total} != file_size {file_size}"
 
-    @given(
-        file_size=st.integers(min_value=1, max_value=13 * (1024**3)),
-    )
-    def test_planned_chunks_are_valid(self, file_size):
-        orch = ChunkingOrchestrator()
+    @settings(max_examples=30)
+    @given(file_size=FILE_SIZES)
+    def test_planned_chunks_are_valid(self, orch, file_size):
         chunks = orch.plan_chunks(file_size)
         assert orch.validate_chunks(file_size, chunks), "Planned chunks should be valid"
 
-    @given(
-        file_size=st.integers(min_value=1, max_value=13 * (1024**3)),
-    )
-    def test_wallet_count_in_range(self, file_size):
-        orch = ChunkingOrchestrator()
+    @given(file_size=FILE_SIZES)
+    def test_wallet_count_in_range(self, orch, file_size):
         count = orch.calculate_wallet_count(file_size)
         assert count >= 4, "Wallet count too low"
         assert count <= orch.max_wallets, "Wallet count exceeds max"
@@ -153,8 +169,7 @@ class TestChunkingOrchestrator_PropertyBased:
     @given(
         file_size=st.integers(min_value=1, max_value=100 * 1024**3),
     )
-    def test_chunk_size_respects_bounds(self, file_size):
-        orch = ChunkingOrchestrator()
+    def test_chunk_size_respects_bounds(self, orch, file_size):
         wallet_count = orch.calculate_wallet_count(file_size)
         chunk_size = orch.calculate_chunk_size(file_size, wallet_count)
         assert chunk_size >= orch.min_chunk_size, "Chunk too small"
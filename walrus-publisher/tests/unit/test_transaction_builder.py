@@ -1,5 +1,7 @@
 import pytest
 import base64
+import json
+from unittest.mock import patch
 from transaction_builder import TransactionBuilder
 
 
@@ -42,3 +44,37 @@ def test_transaction_builder_whitespace_trim():
     )
     assert builder.walrus_package_id == "0x1234567890abcdef"
     assert builder.walrus_system_object == "0x0000000000000000000000000000000000000000000000000000000000000000"
+
+
+def test_placeholder_transaction_matches_full_json_encoding():
+    builder = TransactionBuilder(
+        walrus_package_id="0x1234567890abcdef",
+        walrus_system_object="0x0000000000000000000000000000000000000000000000000000000000000000",
+    )
+    with patch("transaction_builder.HAS_PYSUI", False):
+        tx_bytes = builder.build_register_blob_transaction(
+            blob_id='blob "quoted"',
+            sub_wallet_address="0x1234567890123456789012345678901234567890",
+            epochs=5,
+        )
+    expected = json.dumps({
+        "package": "0x1234567890abcdef",
+        "system_object": "0x0000000000000000000000000000000000000000000000000000000000000000",
+        "blob_id": 'blob "quoted"',
+        "wallet": "0x1234567890123456789012345678901234567890",
+        "epochs": 5,
+    })
+    assert base64.b64decode(tx_bytes).decode() == expected
+
+
+def test_build_register_blob_transactions_batch():
+    builder = TransactionBuilder(
+        walrus_package_id="0x1234567890abcdef",
+        walrus_system_object="0x0000000000000000000000000000000000000000000000000000000000000000",
+    )
+    registrations = [("blob_0", "0xaaa"), ("blob_1", "0xbbb")]
+    batch = builder.build_register_blob_transactions(registrations, epochs=3)
+    assert batch == [
+        builder.build_register_blob_transaction(blob_id, address, epochs=3)
+        for blob_id, address in registrations
+    ]
@@ -1,16 +1,42 @@
 import pytest
 from hypothesis import given, strategies as st
 from unittest.mock import AsyncMock, Mock, patch
-from uploader import WalrusUploader
+from uploader import BufferPool, WalrusUploader, _parse_blob_id, _stream_file_range
 import httpx
 
 
+def _json_response(body):
+    response = Mock(spec=httpx.Response)
+    response.json.return_value = body
+    return response
+
+
+@pytest.fixture
+def mock_client():
+    """Hand WalrusUploader a mock client in place of httpx.AsyncClient"""
+    with patch('uploader.httpx.AsyncClient') as mock_client_class:
+        client = AsyncMock()
+        mock_client_class.return_value = client
+        yield client
+
+
 @pytest.mark.asyncio
 async def test_uploader_context_manager():
     async with WalrusUploader() as uploader:
         assert uploader.client is not None
 
 
+@pytest.mark.asyncio
+async def test_uploader_connect_reuses_client():
+    uploader = WalrusUploader()
+    await uploader.connect()
+    client = uploader.client
+    assert client is not None
+    await uploader.disconnect()
+    assert uploader.client is None
+    assert client.is_closed
+
+
 @pytest.mark.asyncio
 async def test_uploader_not_initialized():
     uploader = WalrusUploader()
@@ -19,69 +45,125 @@ async def test_uploader_not_initialized():
 
 
 @pytest.mark.asyncio
-async def test_upload_chunk_success():
-    with patch('uploader.httpx.AsyncClient') as mock_client_class:
-        mock_response = AsyncMock()
-        mock_response.json = Mock(return_value={'blobId': 'test_blob_id_123'})
-        mock_response.raise_for_status = Mock()
+async def test_upload_chunk_success(mock_client):
+    mock_client.put.return_value = _json_response({'blobId': 'test_blob_id_123'})
+
+    async with WalrusUploader() as uploader:
+        blob_id = await uploader.upload_chunk(b"test_data", 0)
+        assert blob_id == 'test_blob_id_123'
+
 
-        mock_client = AsyncMock()
-        mock_client.put = AsyncMock(return_value=mock_response)
-        mock_client.aclose = AsyncMock()
-        mock_client_class.return_value = mock_client
+@pytest.mark.asyncio
+async def test_upload_chunk_fallback_snake_case(mock_client):
+    mock_client.put.return_value = _json_response({'blob_id': 'test_blob_id_456'})
 
-        async with WalrusUploader() as uploader:
-            blob_id = await uploader.upload_chunk(b"test_data", 0)
-            assert blob_id == 'test_blob_id_123'
+    async with WalrusUploader() as uploader:
+        blob_id = await uploader.upload_chunk(b"test_data", 0)
+        assert blob_id == 'test_blob_id_456'
 
 
 @pytest.mark.asyncio
-async def test_upload_chunk_fallback_snake_case():
-    with patch('uploader.httpx.AsyncClient') as mock_client_class:
-        mock_response = AsyncMock()
-        mock_response.json = Mock(return_value={'blob_id': 'test_blob_id_456'})
-        mock_response.raise_for_status = Mock()
+async def test_upload_chunk_missing_blob_id(mock_client):
+    mock_client.put.return_value = _json_response({'some_field': 'some_value'})
 
-        mock_client = AsyncMock()
-        mock_client.put = AsyncMock(return_value=mock_response)
-        mock_client.aclose = AsyncMock()
-        mock_client_class.return_value = mock_client
+    async with WalrusUploader() as uploader:
+        with pytest.raises(ValueError, match="No blob_id"):
+            await uploader.upload_chunk(b"test_data", 0)
 
-        async with WalrusUploader() as uploader:
-            blob_id = await uploader.upload_chunk(b"test_data", 0)
-            assert blob_id == 'test_blob_id_456'
+
+@pytest.mark.asyncio
+async def test_upload_chunk_http_error(mock_client):
+    mock_client.put.side_effect = httpx.HTTPError("Connection error")
+
+    async with WalrusUploader() as uploader:
+        with pytest.raises(RuntimeError, match="Failed to upload chunk"):
+            await uploader.upload_chunk(b"test_data", 0)
 
 
 @pytest.mark.asyncio
-async def test_upload_chunk_missing_blob_id():
-    with patch('uploader.httpx.AsyncClient') as mock_client_class:
-        mock_response = AsyncMock()
-        mock_response.json = Mock(return_value={'some_field': 'some_value'})
-        mock_response.raise_for_status = Mock()
+async def test_upload_chunk_streams_async_iterable():
+    received = {}
 
-        mock_client = AsyncMock()
-        mock_client.put = AsyncMock(return_value=mock_response)
-        mock_client.aclose = AsyncMock()
-        mock_client_class.return_value = mock_client
+    def handler(request):
+        received["body"] = request.read()
+        received["content_length"] = request.headers.get("Content-Length")
+        return httpx.Response(200, json={"blobId": "streamed_blob"})
 
-        async with WalrusUploader() as uploader:
-            with pytest.raises(ValueError, match="No blob_id"):
-                await uploader.upload_chunk(b"test_data", 0)
+    async def blocks():
+        yield b"abc"
+        yield b"def"
+
+    uploader = WalrusUploader()
+    uploader.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    try:
+        blob_id = await uploader.upload_chunk(blocks(), 0, content_length=6)
+    finally:
+        await uploader.disconnect()
+
+    assert blob_id == "streamed_blob"
+    assert received["body"] == b"abcdef"
+    assert received["content_length"] == "6"
 
 
 @pytest.mark.asyncio
-async def test_upload_chunk_http_error():
-    with patch('uploader.httpx.AsyncClient') as mock_client_class:
-        mock_client = AsyncMock()
-        mock_client.put = AsyncMock(
-            side_effect=httpx.HTTPError("Connection error")
-        )
-        mock_client.aclose = AsyncMock()
-        mock_client_class.return_value = mock_client
+async def test_upload_chunk_streams_file_range(tmp_path):
+    received = {}
+
+    def handler(request):
+        received["body"] = request.read()
+        received["content_length"] = request.headers.get("Content-Length")
+        return httpx.Response(200, json={"blobId": "ranged_blob"})
+
+    path = tmp_path / "audio.bin"
+    path.write_bytes(b"0123456789")
 
-        async with WalrusUploader() as uploader:
-            with pytest.raises(RuntimeError, match="Failed to upload chunk"):
-                await uploader.upload_chunk(b"test_data", 0)
+    uploader = WalrusUploader()
+    uploader.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    try:
+        blob_id = await uploader.upload_chunk((path, 3, 5), 1)
+    finally:
+        await uploader.disconnect()
+
+    assert blob_id == "ranged_blob"
+    assert received["body"] == b"34567"
+    assert received["content_length"] == "5"
+
+
+@pytest.mark.asyncio
+async def test_stream_file_range_rejects_short_file(tmp_path):
+    path = tmp_path / "audio.bin"
+    path.write_bytes(b"0123")
+    with pytest.raises(ValueError, match="ended 2 bytes before"):
+        async for _ in _stream_file_range(path, 0, 6, BufferPool(1, 2)):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_stream_file_range_reuses_pooled_buffer(tmp_path):
+    path = tmp_path / "audio.bin"
+    path.write_bytes(b"0123456789")
+    pool = BufferPool(1, 4)
+
+    blocks = [bytes(block) async for block in _stream_file_range(path, 1, 7, pool)]
+
+    assert blocks == [b"1234", b"567"]
+    # The buffer went back to the pool, so the next stream reuses it
+    buffer = await pool.acquire()
+    assert len(buffer) == 4
+    assert pool._created == 1
+
+
+@pytest.mark.parametrize("result", [
+    {"newlyCreated": {"blobObject": {"blobId": "blob_a"}}},
+    {"alreadyCertified": {"blobId": "blob_a"}},
+    {"blob_id": "blob_a"},
+])
+def test_parse_blob_id_response_shapes(result):
+    assert _parse_blob_id(result) == "blob_a"
+
+
+def test_parse_blob_id_missing():
+    assert _parse_blob_id({"newlyCreated": {"blobObject": {}}}) is None
 
 
 class TestWalrusUploader_PropertyBased:
@@ -92,13 +174,8 @@ class TestWalrusUploader_PropertyBased:
     @pytest.mark.asyncio
     async def test_upload_chunk_size_handling(self, chunk_size, chunk_index):
         with patch('uploader.httpx.AsyncClient') as mock_client_class:
-            mock_response = AsyncMock()
-            mock_response.json = Mock(return_value={'blobId': f'blob_{chunk_index}'})
-            mock_response.raise_for_status = Mock()
-
             mock_client = AsyncMock()
-            mock_client.put = AsyncMock(return_value=mock_response)
-            mock_client.aclose = AsyncMock()
+            mock_client.put.return_value = _json_response({'blobId': f'blob_{chunk_index}'})
             mock_client_class.return_value = mock_client
 
             async with WalrusUploader() as uploader:
@@ -1,11 +1,18 @@
+import asyncio
 import pytest
-from wallet_manager import WalletManager, WalletInfo
+from unittest.mock import patch
+from wallet_manager import INLINE_GENERATION_MAX_WALLETS, WalletManager, WalletInfo
 
 
-@pytest.mark.asyncio
-async def test_create_ephemeral_wallet():
+@pytest.fixture
+def manager(redis_client):
     manager = WalletManager("redis://localhost:6379")
-    manager.redis = None
+    manager.redis = redis_client
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_create_ephemeral_wallet(manager):
     wallet = await manager.create_ephemeral_wallet("session_123", 0)
     assert wallet.address.startswith("0x")
     assert len(wallet.address) >= 40
@@ -14,9 +21,7 @@ async def test_create_ephemeral_wallet():
 
 
 @pytest.mark.asyncio
-async def test_create_wallet_pool():
-    manager = WalletManager("redis://localhost:6379")
-    manager.redis = None
+async def test_create_wallet_pool(manager):
     wallets = await manager.create_wallet_pool("session_456", 5)
     assert len(wallets) == 5
     addresses = {w.address for w in wallets}
@@ -24,18 +29,83 @@ async def test_create_wallet_pool():
 
 
 @pytest.mark.asyncio
-async def test_wallet_uniqueness():
-    manager = WalletManager("redis://localhost:6379")
-    manager.redis = None
+async def test_create_wallet_pool_wallet_format(manager):
+    wallets = await manager.create_wallet_pool("session_fmt", 8)
+    for wallet in wallets:
+        assert wallet.address.startswith("0x")
+        assert len(wallet.address) >= 40
+        assert len(wallet.private_key) >= 64
+        assert set(wallet.address[2:] + wallet.private_key) <= set("0123456789abcdef")
+    assert len({w.private_key for w in wallets}) == 8
+
+
+@pytest.mark.asyncio
+async def test_wallet_uniqueness(manager):
     wallet1 = await manager.create_ephemeral_wallet("session_789", 0)
     wallet2 = await manager.create_ephemeral_wallet("session_789", 1)
     assert wallet1.address != wallet2.address
     assert wallet1.private_key != wallet2.private_key
 
 
+def test_wallet_info_is_slotted():
+    wallet = WalletInfo(address="0x1", private_key="ab")
+    assert not hasattr(wallet, "__dict__")
+
+
 @pytest.mark.asyncio
 async def test_wallet_manager_initialization():
     """Test wallet manager can be initialized with config"""
     manager = WalletManager("redis://localhost:6379")
     assert manager.redis_url == "redis://localhost:6379"
     assert manager.redis is None
+
+
+@pytest.mark.asyncio
+async def test_unconnected_manager_refuses_wallet_operations():
+    manager = WalletManager("redis://localhost:6379")
+    with pytest.raises(RuntimeError, match="not connected"):
+        await manager.create_wallet_pool("session_offline", 2)
+    with pytest.raises(RuntimeError, match="not connected"):
+        await manager.create_ephemeral_wallet("session_offline", 0)
+    with pytest.raises(RuntimeError, match="not connected"):
+        await manager.get_wallet("session_offline", 0)
+
+
+@pytest.mark.asyncio
+async def test_create_wallet_pool_stores_every_wallet(manager):
+    wallets = await manager.create_wallet_pool("session_pool", 4)
+    for i, wallet in enumerate(wallets):
+        stored = await manager.get_wallet("session_pool", i)
+        assert stored is not None
+        assert stored.address == wallet.address
+        assert stored.private_key == wallet.private_key
+
+
+@pytest.mark.asyncio
+async def test_cleanup_session_removes_wallets_and_session_keys(manager):
+    await manager.create_wallet_pool("session_cleanup", 3)
+    await manager.redis.hset("session:session_cleanup", "file_size", "1")
+    await manager.redis.hset("session:session_cleanup:chunks", "0", "blob")
+    await manager.redis.set("session:other:chunks", "kept")
+
+    await manager.cleanup_session(
+        "session_cleanup",
+        3,
+        session_keys=("session:session_cleanup", "session:session_cleanup:chunks"),
+    )
+
+    assert await manager.redis.keys("*") == [b"session:other:chunks"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("wallet_count,offloaded", [
+    (1, False),
+    (INLINE_GENERATION_MAX_WALLETS, False),
+    (INLINE_GENERATION_MAX_WALLETS + 1, True),
+])
+async def test_create_wallet_pool_offloads_only_large_pools(manager, wallet_count, offloaded):
+    loop = asyncio.get_running_loop()
+    with patch.object(loop, "run_in_executor", wraps=loop.run_in_executor) as run_in_executor:
+        wallets = await manager.create_wallet_pool("session_offload", wallet_count)
+    assert len(wallets) == wallet_count
+    assert run_in_executor.called is offloaded
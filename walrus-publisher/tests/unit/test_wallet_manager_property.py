@@ -3,40 +3,47 @@ from hypothesis import given, strategies as st
 from wallet_manager import WalletManager
 
 
+# Same shape as UploadOrchestrator's uuid4().hex session ids
+SESSION_IDS = st.binary(min_size=16, max_size=16).map(bytes.hex)
+# Set comparison rather than int(s, 16), which also accepts signs, "0x",
+# underscores and surrounding whitespace
+HEX_DIGITS = frozenset("0123456789abcdef")
+
+
 class TestWalletManager_PropertyBased:
     @given(
-        session_id=st.uuids().map(str),
+        session_id=SESSION_IDS,
         index=st.integers(min_value=0, max_value=255),
     )
     @pytest.mark.asyncio
-    async def test_wallet_address_format(self, session_id, index):
+    async def test_wallet_address_format(self, fake_redis, session_id, index):
         manager = WalletManager("redis://localhost:6379")
-        manager.redis = None
+        manager.redis = fake_redis
         wallet = await manager.create_ephemeral_wallet(session_id, index)
         assert wallet.address.startswith('0x')
         assert len(wallet.address) >= 40
-        assert all(c in '0123456789abcdef' for c in wallet.address[2:])
+        assert set(wallet.address[2:]) <= HEX_DIGITS
 
     @given(
-        session_id=st.uuids().map(str),
+        session_id=SESSION_IDS,
         index=st.integers(min_value=0, max_value=255),
     )
     @pytest.mark.asyncio
-    async def test_wallet_private_key_format(self, session_id, index):
+    async def test_wallet_private_key_format(self, fake_redis, session_id, index):
         manager = WalletManager("redis://localhost:6379")
-        manager.redis = None
+        manager.redis = fake_redis
         wallet = await manager.create_ephemeral_wallet(session_id, index)
         assert len(wallet.private_key) >= 64
-        assert all(c in '0123456789abcdef' for c in wallet.private_key)
+        assert set(wallet.private_key) <= HEX_DIGITS
 
     @given(
-        session_id=st.uuids().map(str),
+        session_id=SESSION_IDS,
         indices=st.lists(st.integers(min_value=0, max_value=100), min_size=2, max_size=20),
     )
     @pytest.mark.asyncio
-    async def test_different_wallets_are_unique(self, session_id, indices):
+    async def test_different_wallets_are_unique(self, fake_redis, session_id, indices):
         manager = WalletManager("redis://localhost:6379")
-        manager.redis = None
+        manager.redis = fake_redis
         wallets = []
         for idx in indices:
             wallet = await manager.create_ephemeral_wallet(session_id, idx)
@@ -49,13 +56,13 @@ class TestWalletManager_PropertyBased:
         assert len(set(private_keys)) == len(wallets), "Private keys should be unique"
 
     @given(
-        session_id=st.uuids().map(str),
+        session_id=SESSION_IDS,
         wallet_count=st.integers(min_value=1, max_value=256),
     )
     @pytest.mark.asyncio
-    async def test_create_wallet_pool_count(self, session_id, wallet_count):
+    async def test_create_wallet_pool_count(self, fake_redis, session_id, wallet_count):
         manager = WalletManager("redis://localhost:6379")
-        manager.redis = None
+        manager.redis = fake_redis
         wallets = await manager.create_wallet_pool(session_id, wallet_count)
         assert len(wallets) == wallet_count
         assert all(w.address and w.private_key for w in wallets)